@@ -1,10 +1,22 @@
+import bisect
 import io
 import logging
 import os
+import tempfile
 import threading
+import zlib
 from contextlib import contextmanager
 from datetime import timedelta
-from typing import Any, Dict, Generator, Iterator, List
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
 import httpx
 from chaoslib.discovery.discover import (
@@ -27,20 +39,156 @@ try:
 except ImportError:
     HAS_HTTPX_OLTP = False
 
+try:
+    import zstandard
+
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
 from .__version__ import __version__
 
 __all__ = [
     "get_session",
+    "close_sessions",
     "discover",
     "parse_duration",
     "attach_log_stream_handler",
 ]
 RELIABLY_HOST = "app.reliably.com"
-STREAM_LOG = io.StringIO()
+
+
+class LogBuffer(io.TextIOBase):
+    """
+    Append-only buffer holding the log of the execution.
+
+    Each write is kept as a UTF-8 encoded chunk so readers can fetch only
+    what was written after a given byte offset, without copying the whole
+    log every time.
+
+    Once the chunks held in memory go over `max_memory` bytes, they are
+    moved to a temporary file so memory stays flat however verbose the
+    execution is.
+    """
+
+    def __init__(self, max_memory: Optional[int] = None) -> None:
+        if max_memory is None:
+            max_memory = int(
+                os.getenv("RELIABLY_LOG_BUFFER_MAX_MEMORY", 1024 * 1024)
+            )
+
+        self.max_memory = max_memory
+        self._lock = threading.Lock()
+        self._chunks: List[bytes] = []
+        self._offsets: List[int] = []
+        self._size = 0
+        self._memory = 0
+        self._spilled = 0
+        self._file: Optional[IO[bytes]] = None
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._size
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        data = s.encode("utf-8")
+        with self._lock:
+            self._offsets.append(self._size)
+            self._chunks.append(data)
+            self._size += len(data)
+            self._memory += len(data)
+            if self._memory > self.max_memory:
+                self._spill()
+        return len(s)
+
+    def iter_from(
+        self, offset: int = 0, chunk_size: int = 65536
+    ) -> Iterator[bytes]:
+        """
+        Stream the log written after the byte `offset` as UTF-8 bytes.
+        """
+        spilled, chunks, start, _ = self._snapshot(offset)
+
+        position = offset
+        while position < spilled:
+            with self._lock:
+                if self._file is None:
+                    break
+                self._file.seek(position)
+                data = self._file.read(min(chunk_size, spilled - position))
+            if not data:
+                break
+            position += len(data)
+            yield data
+
+        if chunks:
+            yield chunks[0][start:]
+            yield from chunks[1:]
+
+    def read_from(self, offset: int = 0) -> Tuple[str, int]:
+        """
+        Return the log written after the byte `offset` and the offset to
+        read from next time.
+        """
+        size = self.size
+        data = b"".join(self.iter_from(offset))[: size - offset]
+        return (data.decode("utf-8", errors="replace"), size)
+
+    def getvalue(self) -> str:
+        return self.read_from(0)[0]
+
+    def reset(self) -> None:
+        """
+        Drop everything written so far.
+        """
+        with self._lock:
+            self._chunks = []
+            self._offsets = []
+            self._size = self._memory = self._spilled = 0
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _spill(self) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="reliably-log-")
+
+        self._file.seek(0, io.SEEK_END)
+        self._file.write(b"".join(self._chunks))
+        self._file.flush()
+
+        self._spilled = self._size
+        self._chunks = []
+        self._offsets = []
+        self._memory = 0
+
+    def _snapshot(self, offset: int) -> Tuple[int, List[bytes], int, int]:
+        with self._lock:
+            if offset <= self._spilled or not self._offsets:
+                index = 0
+            else:
+                index = bisect.bisect_right(self._offsets, offset) - 1
+
+            chunks = self._chunks[index:]
+            start = 0
+            if chunks:
+                start = max(offset - self._offsets[index], 0)
+
+            return (self._spilled, chunks, start, self._size)
+
+
+STREAM_LOG = LogBuffer()
 
 logger = logging.getLogger("chaostoolkit")
 shared_state_lock = threading.Lock()
 shared_state = {}  # type: ignore
+sessions_lock = threading.Lock()
+sessions = {}  # type: Dict[Tuple[str, bool, bool, str], httpx.Client]
+accepted_encodings = {}  # type: Dict[str, List[str]]
 
 
 @contextmanager
@@ -48,6 +196,12 @@ def get_session(
     configuration: Configuration = None,
     secrets: Secrets = None,
 ) -> Generator[httpx.Client, None, None]:
+    """
+    Yield a client to the Reliably API.
+
+    Clients are pooled per host, TLS settings and token so that connections
+    are kept alive between calls. Call `close_sessions` to release them.
+    """
     c = configuration or {}
     verify_tls = c.get(
         "reliably_verify_tls",
@@ -60,27 +214,69 @@ def get_session(
     )
     scheme = "http" if use_http else "https"
     auth_info = get_auth_info(configuration, secrets)
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer {}".format(auth_info["token"]),
-    }
-
-    with httpx.Client(
-        verify=verify_tls, http2=with_http2, timeout=30
-    ) as client:
-        # do not pollute users traces
-        if HAS_HTTPX_OLTP:
-            try:
-                if client._is_instrumented_by_opentelemetry:  # type: ignore
-                    HTTPXClientInstrumentor.uninstrument_client(client)
-            except AttributeError:
-                pass
-
-        client.headers = httpx.Headers(headers)
-        client.base_url = httpx.URL(
-            f"{scheme}://{auth_info['host']}/api/v1/organization"
-        )
-        yield client
+    base_url = f"{scheme}://{auth_info['host']}/api/v1/organization"
+
+    key = (base_url, verify_tls, with_http2, auth_info["token"])
+    with sessions_lock:
+        client = sessions.get(key)
+        if client is None or client.is_closed:
+            client = make_session(
+                base_url, auth_info["token"], verify_tls, with_http2
+            )
+            sessions[key] = client
+
+    yield client
+
+
+def close_sessions() -> None:
+    """
+    Close all the pooled clients to the Reliably API.
+    """
+    with sessions_lock:
+        clients = list(sessions.values())
+        sessions.clear()
+        accepted_encodings.clear()
+
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            logger.debug("Failed to close Reliably session", exc_info=True)
+
+
+def get_request_encoding(client: httpx.Client) -> Optional[str]:
+    """
+    Return the content-coding to compress request bodies with, as advertised
+    by the server in the `Accept-Encoding` header of its responses (see
+    RFC 7694), or `None` when it did not say it supports any we know of.
+    """
+    with sessions_lock:
+        codings = accepted_encodings.get(client.base_url.host, [])
+
+    if HAS_ZSTD and "zstd" in codings:
+        return "zstd"
+
+    if "gzip" in codings:
+        return "gzip"
+
+    return None
+
+
+def compress_body(chunks: Iterator[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Compress a stream of bytes with the given content-coding.
+    """
+    if encoding == "zstd":
+        compressor = zstandard.ZstdCompressor().compressobj()
+    else:
+        compressor = zlib.compressobj(wbits=31)
+
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+
+    yield compressor.flush()
 
 
 def discover(discover_system: bool = True) -> Discovery:
@@ -134,6 +330,48 @@ def get_auth_info(
     return {"host": reliably_host, "token": reliably_token}
 
 
+def make_session(
+    base_url: str, token: str, verify_tls: bool, with_http2: bool
+) -> httpx.Client:
+    client = httpx.Client(
+        verify=verify_tls,
+        http2=with_http2,
+        timeout=30,
+        event_hooks={"response": [remember_accepted_encodings]},
+        limits=httpx.Limits(
+            max_connections=10, max_keepalive_connections=5, keepalive_expiry=30
+        ),
+    )
+
+    # do not pollute users traces
+    if HAS_HTTPX_OLTP:
+        try:
+            if client._is_instrumented_by_opentelemetry:  # type: ignore
+                HTTPXClientInstrumentor.uninstrument_client(client)
+        except AttributeError:
+            pass
+
+    client.headers = httpx.Headers(
+        {
+            "Content-Type": "application/json",
+            "Authorization": "Bearer {}".format(token),
+        }
+    )
+    client.base_url = httpx.URL(base_url)
+
+    return client
+
+
+def remember_accepted_encodings(response: httpx.Response) -> None:
+    value = response.headers.get("Accept-Encoding")
+    if value is None:
+        return None
+
+    codings = [c.split(";")[0].strip().lower() for c in value.split(",")]
+    with sessions_lock:
+        accepted_encodings[response.request.url.host] = codings
+
+
 def load_exported_activities() -> List[DiscoveredActivities]:
     """
     Extract metadata from actions, probes and tolerances
@@ -1,12 +1,447 @@
+import hashlib
+import logging
 import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Tuple, cast
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple, cast
+from urllib.parse import parse_qs, urlparse
 
-from chaoslib.exceptions import InvalidActivity
+import httpx
+import orjson
+from chaoslib.exceptions import ActivityFailed, InvalidActivity
 from chaoslib.types import Secrets
 
 from chaosreliably import parse_duration
 
+logger = logging.getLogger("chaostoolkit")
+GITHUB_API_URL = "https://api.github.com"
+# response headers we need to rebuild a response from the cache
+CACHED_HEADERS = ("content-type", "etag", "last-modified", "link")
+# GitHub's secondary rate limit allows 900 points per minute on its REST API,
+# a GET call costing a point
+DEFAULT_RATE = 15.0
+# times a call is made when GitHub tells us to slow down
+MAX_ATTEMPTS = 3
+
+
+class RateLimiter:
+    """
+    Budget of calls GitHub lets a token make, shared by all the calls made
+    with that token in the process.
+
+    Calls are paced by a token bucket holding up to `burst` calls, refilled
+    so that what's left of the budget (`X-RateLimit-Remaining`) lasts until
+    GitHub resets it (`X-RateLimit-Reset`). Once the budget is exhausted, or
+    when GitHub asked to retry later (`Retry-After`), calls are queued until
+    they can be made again, and fail only when that's more than `max_wait`
+    seconds away.
+
+    The budget is whatever GitHub last told us, minus the calls still in
+    flight, so calls GitHub doesn't count, such as 304 responses, don't
+    spend it.
+    """
+
+    def __init__(
+        self,
+        burst: int = 100,
+        rate: float = DEFAULT_RATE,
+        max_wait: Optional[float] = None,
+    ) -> None:
+        self.burst = burst
+        self.default_rate = self.rate = rate
+        if max_wait is None:
+            max_wait = float(os.getenv("RELIABLY_GITHUB_MAX_WAIT", "60"))
+        self.max_wait = max_wait
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self.remaining = None  # type: Optional[int]
+        self.in_flight = 0
+        self.reset_at = 0.0
+        self.retry_at = 0.0
+        self.cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Wait until a call can be made and take it from the budget.
+
+        Raise `ActivityFailed` when the budget can't fit that call within
+        `max_wait` seconds.
+        """
+        with self.cond:
+            deadline = time.monotonic() + self.max_wait
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                ready_at = self._ready_at(now)
+                if ready_at <= now:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return None
+
+                if ready_at > deadline:
+                    raise ActivityFailed(self._explain(ready_at - now))
+
+                self.cond.wait(ready_at - now)
+
+    def release(self) -> None:
+        """
+        Give back a call that got no response.
+        """
+        with self.cond:
+            self.in_flight = max(self.in_flight - 1, 0)
+            self.cond.notify_all()
+
+    def update(self, response: httpx.Response) -> bool:
+        """
+        Update the budget from the rate limit headers of `response`, which
+        is no longer in flight, and return whether GitHub rejected it
+        because of its rate limits.
+        """
+        headers = response.headers
+        now = time.monotonic()
+        with self.cond:
+            self.in_flight = max(self.in_flight - 1, 0)
+            remaining = None  # type: Optional[int]
+            try:
+                remaining = int(headers["x-ratelimit-remaining"])
+                reset = float(headers["x-ratelimit-reset"])
+            except (KeyError, ValueError):
+                remaining = None
+
+            if remaining is not None:
+                reset_at = now + max(reset - time.time(), 0.0)
+                self.remaining = remaining
+                self.reset_at = reset_at
+                self.rate = min(
+                    self.default_rate,
+                    max(remaining, 1) / max(reset_at - now, 1.0),
+                )
+
+            limited = False
+            if response.status_code in (403, 429):
+                retry_after = headers.get("retry-after")
+                if retry_after:
+                    try:
+                        delay = float(retry_after)
+                    except ValueError:
+                        delay = 60.0
+                    self.retry_at = max(self.retry_at, now + delay)
+                    limited = True
+                elif remaining == 0:
+                    self.retry_at = max(self.retry_at, self.reset_at)
+                    limited = True
+
+            self.cond.notify_all()
+
+        return limited
+
+    def _refill(self, now: float) -> None:
+        if self.remaining is not None and now >= self.reset_at:
+            # GitHub gave us a new budget
+            self.remaining = None
+            self.rate = self.default_rate
+
+        self.tokens = min(
+            float(self.burst), self.tokens + (now - self.last) * self.rate
+        )
+        self.last = now
+
+    def _ready_at(self, now: float) -> float:
+        ready_at = max(now, self.retry_at)
+        if self.remaining is not None and self.remaining - self.in_flight < 1:
+            ready_at = max(ready_at, self.reset_at)
+        if self.tokens < 1:
+            ready_at = max(ready_at, now + (1 - self.tokens) / self.rate)
+        return ready_at
+
+    def _explain(self, delay: float) -> str:
+        if self.retry_at > time.monotonic():
+            return (
+                f"GitHub asked to retry in {int(delay)}s, which is more than "
+                f"the {int(self.max_wait)}s we can wait for"
+            )
+
+        return (
+            "The GitHub rate limit of this token is exhausted and resets in "
+            f"{int(delay)}s, which is more than the {int(self.max_wait)}s we "
+            "can wait for"
+        )
+
+
+class ResponseCache:
+    """
+    Keep the last successful response to each GET call made to GitHub, to
+    call again conditionally: GitHub doesn't count 304 responses against the
+    rate limit.
+
+    Responses are kept in memory, up to `max_bytes` of content, and, when
+    `directory` is set, on disk so they outlive the process. A response
+    larger than `max_bytes` is not cached at all.
+    """
+
+    def __init__(
+        self, directory: Optional[str] = None, max_bytes: int = 8 * 1024**2
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # type: OrderedDict[str, Dict[str, Any]]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry
+
+        if not self.directory:
+            return None
+
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = cast(Dict[str, Any], orjson.loads(f.read()))
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+        self._remember(key, entry)
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        if len(entry["content"]) > self.max_bytes:
+            return None
+
+        self._remember(key, entry)
+
+        if not self.directory:
+            return None
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(entry))
+            os.replace(tmp, self._path(key))
+        except OSError:
+            logger.debug("Failed to cache GitHub response", exc_info=True)
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous["content"])
+
+            self.entries[key] = entry
+            self.size += len(entry["content"])
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted["content"])
+
+    def _path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")  # type: ignore
+
+
+class GitHubClient:
+    """
+    Client to the GitHub API keeping its HTTP/2 connection alive across
+    calls.
+
+    GET calls are made conditionally when a previous response is in the
+    `cache` and a 304 is served from it. Only the first page of listings is
+    cached, the next ones are always fetched. All calls are paced by the rate
+    limiter of the token and made again when GitHub tells to slow down.
+
+    Listings are fetched `per_page` items at a time and, once the first page
+    tells how many there are, up to `prefetch` of the next pages are fetched
+    concurrently while the current one is processed.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        per_page: int = 100,
+        prefetch: int = 4,
+        cache: Optional[ResponseCache] = None,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self.per_page = per_page
+        self.prefetch = prefetch
+        self.cache = cache
+        self.limiter = limiter or get_limiter(token)
+        # cached responses are only reused with the token that got them
+        self.cache_prefix = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        self.client = httpx.Client(
+            base_url=GITHUB_API_URL,
+            http2=True,
+            timeout=30,
+            headers={
+                "accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+                "Authorization": f"Bearer {token}",
+            },
+        )
+
+    def __enter__(self) -> "GitHubClient":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.client.close()
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+    ) -> httpx.Response:
+        request = self.client.build_request("GET", url, params=params)
+        if self.cache is None or not use_cache:
+            return self.send(request)
+
+        key = f"{self.cache_prefix} {request.url}"
+        cached = self.cache.get(key)
+        if cached:
+            if cached.get("etag"):
+                request.headers["If-None-Match"] = cached["etag"]
+            if cached.get("last-modified"):
+                request.headers["If-Modified-Since"] = cached["last-modified"]
+
+        r = self.send(request)
+        if r.status_code == 304 and cached:
+            logger.debug(f"GitHub response to {request.url} served from cache")
+            return httpx.Response(
+                200,
+                headers={k: cached[k] for k in CACHED_HEADERS if cached.get(k)},
+                content=cached["content"].encode("utf-8"),
+                request=request,
+            )
+
+        if r.status_code == 200 and (
+            r.headers.get("etag") or r.headers.get("last-modified")
+        ):
+            entry = {k: r.headers.get(k) for k in CACHED_HEADERS}
+            entry["content"] = r.text
+            self.cache.set(key, entry)
+
+        return r
+
+    def post(
+        self, url: str, params: Optional[Dict[str, Any]] = None
+    ) -> httpx.Response:
+        return self.send(self.client.build_request("POST", url, params=params))
+
+    def send(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self.limiter.acquire()
+            try:
+                r = self.client.send(request)
+            except Exception:
+                self.limiter.release()
+                raise
+
+            if not self.limiter.update(r) or attempt == MAX_ATTEMPTS:
+                break
+            logger.debug(f"GitHub rate limited {request.url}, trying again")
+
+        return r
+
+    def iter_pages(
+        self, url: str, params: Optional[Dict[str, Any]] = None
+    ) -> Iterator[httpx.Response]:
+        """
+        Yield the response of each page of the listing at `url`, in order.
+
+        Stop iterating to stop fetching: no more than `prefetch` pages are
+        fetched ahead of the one being processed.
+        """
+        params = dict(params or {}, per_page=self.per_page, page=1)
+        r = self.get(url, params)
+        yield r
+
+        last_page = get_last_page(r)
+        if last_page is None:
+            # no Link header: there's a single page or we can only follow
+            # the next ones
+            next_url = r.links.get("next", {}).get("url")
+            while r.status_code < 400 and next_url:
+                r = self.get(next_url, use_cache=False)
+                yield r
+                next_url = r.links.get("next", {}).get("url")
+            return None
+
+        pending: Deque[Future[httpx.Response]] = deque()
+        pages = iter(range(2, last_page + 1))
+        with ThreadPoolExecutor(
+            max_workers=self.prefetch, thread_name_prefix="reliably-gh"
+        ) as pool:
+            try:
+                for page in pages:
+                    pending.append(
+                        pool.submit(
+                            self.get, url, dict(params, page=page), False
+                        )
+                    )
+                    if len(pending) >= self.prefetch:
+                        break
+
+                while pending:
+                    r = pending.popleft().result()
+                    page = next(pages, None)  # type: ignore
+                    if page is not None:
+                        pending.append(
+                            pool.submit(
+                                self.get, url, dict(params, page=page), False
+                            )
+                        )
+                    yield r
+            finally:
+                for f in pending:
+                    f.cancel()
+
+
+# a client per token, shared by all the GitHub activities of the process
+clients_lock = threading.Lock()
+clients = {}  # type: Dict[str, GitHubClient]
+response_cache = ResponseCache(os.getenv("RELIABLY_GITHUB_CACHE_DIR"))
+# the rate limit budget is per token whatever the client using it
+limiters_lock = threading.Lock()
+limiters = {}  # type: Dict[str, RateLimiter]
+
+
+def get_client(token: str) -> GitHubClient:
+    with clients_lock:
+        client = clients.get(token)
+        if client is None:
+            client = clients[token] = GitHubClient(token, cache=response_cache)
+        return client
+
+
+def get_limiter(token: str) -> RateLimiter:
+    with limiters_lock:
+        limiter = limiters.get(token)
+        if limiter is None:
+            limiter = limiters[token] = RateLimiter()
+        return limiter
+
+
+def get_last_page(response: httpx.Response) -> Optional[int]:
+    last = response.links.get("last", {}).get("url")
+    if not last:
+        return None
+
+    page = parse_qs(urlparse(last).query).get("page")
+    if not page:
+        return None
+
+    return int(page[0])
+
 
 def get_gh_token(secrets: Secrets) -> str:
     secrets = secrets or {}
@@ -3,11 +3,10 @@ import random
 import re
 from typing import Any, Dict, Optional, cast
 
-import httpx
 from chaoslib.exceptions import ActivityFailed
 from chaoslib.types import Configuration, Secrets
 
-from chaosreliably.activities.gh import get_gh_token, get_period
+from chaosreliably.activities.gh import get_client, get_gh_token, get_period
 
 __all__ = ["cancel_workflow_run"]
 logger = logging.getLogger("chaostoolkit")
@@ -70,15 +69,7 @@ def cancel_workflow_run(
 
         logger.debug(f"Searching for a potential run to cancel with: {params}")
 
-        r = httpx.get(
-            api_url,
-            headers={
-                "accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-                "Authorization": f"Bearer {gh_token}",
-            },
-            params=params,  # type: ignore
-        )
+        r = get_client(gh_token).get(api_url, params)
 
         if r.status_code > 399:
             logger.debug(f"failed to list runs for repo '{repo}': {r.json()}")
@@ -134,14 +125,7 @@ def cancel_workflow_run(
 
     api_url = f"{api_url}/{run_id}/cancel"
 
-    r = httpx.post(
-        api_url,
-        headers={
-            "accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-            "Authorization": f"Bearer {gh_token}",
-        },
-    )
+    r = get_client(gh_token).post(api_url)
 
     if r.status_code > 399:
         logger.debug(f"failed to cancel run {run_id} in '{repo}': {r.json()}")
@@ -4,12 +4,15 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, cast
 from urllib.parse import urlparse
 
-import httpx
 from chaoslib.exceptions import ActivityFailed, InvalidActivity
 from chaoslib.types import Configuration, Secrets
 
 from chaosreliably import parse_duration
-from chaosreliably.activities.gh import get_gh_token, get_period
+from chaosreliably.activities.gh import (
+    get_client,
+    get_gh_token,
+    get_period,
+)
 
 __all__ = [
     "closed_pr_ratio",
@@ -65,26 +68,16 @@ def closed_pr_ratio(
     p = urlparse(repo)
     repo = p.path.strip("/")
 
-    api_url = f"https://api.github.com/repos/{repo}/pulls"
-    page = 1
+    api_url = f"/repos/{repo}/pulls"
+    params = {
+        "base": base,
+        "direction": "desc",
+        "state": "all",
+        "sort": "created",
+    }
     carry_on = True
-    while carry_on:
-        r = httpx.get(
-            api_url,
-            headers={
-                "accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-                "Authorization": f"Bearer {gh_token}",
-            },
-            params={
-                "base": base,
-                "direction": "desc",
-                "state": "all",
-                "sort": "created",
-                "page": page,
-            },
-        )
-
+    client = get_client(gh_token)
+    for r in client.iter_pages(api_url, params):
         if r.status_code > 399:
             logger.debug(f"failed to get PR for repo '{repo}': {r.json()}")
             raise ActivityFailed(f"failed to retrieve PR for repo '{repo}'")
@@ -93,7 +86,6 @@ def closed_pr_ratio(
         if not pulls:
             break
 
-        page = page + 1
         for pull in pulls:
             closed_at = pull["closed_at"]
             if closed_at:
@@ -113,6 +105,9 @@ def closed_pr_ratio(
                 if not closed_at:
                     total_opened += 1
 
+        if not carry_on:
+            break
+
     total = total_opened
     if only_opened_and_closed_during_window:
         total = total_opened_during_period
@@ -180,25 +175,16 @@ def pr_duration(
     else:
         logger.debug(f"looking for PRs in repo '{repo}'")
 
-    api_url = f"https://api.github.com/repos/{repo}/pulls"
-    page = 1
-    while True:
-        r = httpx.get(
-            api_url,
-            headers={
-                "accept": "application/vnd.github+json",
-                "X-GitHub-Api-Version": "2022-11-28",
-                "Authorization": f"Bearer {gh_token}",
-            },
-            params={
-                "base": base,
-                "direction": "desc",
-                "state": "all",
-                "sort": "created",
-                "page": page,
-            },
-        )
-
+    api_url = f"/repos/{repo}/pulls"
+    params = {
+        "base": base,
+        "direction": "desc",
+        "state": "all",
+        "sort": "created",
+    }
+    carry_on = True
+    client = get_client(gh_token)
+    for r in client.iter_pages(api_url, params):
         if r.status_code > 399:
             logger.debug(f"failed to get PR for repo '{repo}': {r.json()}")
             raise ActivityFailed(f"failed to retrieve PR for repo '{repo}'")
@@ -208,8 +194,6 @@ def pr_duration(
             logger.debug("no PRs returned")
             break
 
-        closed_at = created_at = None
-        page = page + 1
         for pull in pulls:
             closed_at = pull["closed_at"]
             if closed_at:
@@ -225,11 +209,14 @@ def pr_duration(
             if created_at:
                 created_dt = datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%SZ")
                 if start_period and created_dt < start_period:
+                    # PRs come from the most recently created so all
+                    # the next ones were created before the window too
                     logger.debug(
                         f"PR {pull['number']} not created within window "
-                        "so ignoring"
+                        "so stopping there"
                     )
-                    continue
+                    carry_on = False
+                    break
             else:
                 logger.debug(f"PR {pull['number']} missing created date")
                 continue
@@ -242,6 +229,9 @@ def pr_duration(
             logger.debug(f"PR {pull['number']} was opened for {d}s")
             durations.append(d)
 
+        if not carry_on:
+            break
+
     return durations
 
 
@@ -282,15 +272,7 @@ def list_workflow_runs(
     if actor:
         params["actor"] = actor
 
-    r = httpx.get(
-        api_url,
-        headers={
-            "accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-            "Authorization": f"Bearer {gh_token}",
-        },
-        params=params,  # type: ignore
-    )
+    r = get_client(gh_token).get(api_url, params)
 
     if r.status_code > 399:
         logger.debug(f"failed to list runs for repo '{repo}': {r.json()}")
@@ -336,15 +318,7 @@ def get_workflow_most_recent_run(
     if actor:
         params["actor"] = actor
 
-    r = httpx.get(
-        api_url,
-        headers={
-            "accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-            "Authorization": f"Bearer {gh_token}",
-        },
-        params=params,  # type: ignore
-    )
+    r = get_client(gh_token).get(api_url, params)
 
     if r.status_code > 399:
         m = (
@@ -396,14 +370,7 @@ def get_workflow_most_recent_run_billing_usage(
         f"https://api.github.com/repos/{repo}/actions/runs/{run_id}/timing"
     )
 
-    r = httpx.get(
-        api_url,
-        headers={
-            "accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-            "Authorization": f"Bearer {gh_token}",
-        },
-    )
+    r = get_client(gh_token).get(api_url)
 
     if r.status_code > 399:
         m = (
@@ -434,14 +401,7 @@ def get_actions_billing_for_organization(
         f"https://api.github.com/orgs/{organization}/settings/billing/actions"
     )
 
-    r = httpx.get(
-        api_url,
-        headers={
-            "accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-            "Authorization": f"Bearer {gh_token}",
-        },
-    )
+    r = get_client(gh_token).get(api_url)
 
     if r.status_code > 399:
         m = f"failed to get billing info for org {organization}: {r.json()}"
@@ -469,14 +429,7 @@ def get_packages_billing_for_organization(
         f"https://api.github.com/orgs/{organization}/settings/billing/packages"
     )
 
-    r = httpx.get(
-        api_url,
-        headers={
-            "accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-            "Authorization": f"Bearer {gh_token}",
-        },
-    )
+    r = get_client(gh_token).get(api_url)
 
     if r.status_code > 399:
         m = f"failed to get billing info for org {organization}: {r.json()}"
@@ -502,14 +455,7 @@ def get_storage_billing_for_organization(
     gh_token = get_gh_token(secrets)
     api_url = f"https://api.github.com/orgs/{organization}/settings/billing/shared-storage"
 
-    r = httpx.get(
-        api_url,
-        headers={
-            "accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-            "Authorization": f"Bearer {gh_token}",
-        },
-    )
+    r = get_client(gh_token).get(api_url)
 
     if r.status_code > 399:
         m = f"failed to get billing info for org {organization}: {r.json()}"
@@ -547,15 +493,7 @@ def ratio_of_failed_workflow_runs_is_lower_than(
     if actor:
         params["actor"] = actor
 
-    r = httpx.get(
-        api_url,
-        headers={
-            "accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-            "Authorization": f"Bearer {gh_token}",
-        },
-        params=params,  # type: ignore
-    )
+    r = get_client(gh_token).get(api_url, params)
 
     if r.status_code > 399:
         m = (
@@ -1,29 +1,248 @@
+import bisect
 import logging
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import httpx
 from chaoslib.types import Configuration, Secrets
 
-__all__ = ["call_endpoint"]
+__all__ = ["call_endpoint", "call_endpoints"]
 logger = logging.getLogger("chaostoolkit")
 
+# safeguards may run several times per second, so each URL keeps a client
+# alive for the whole execution instead of a new connection on every call
+clients_lock = threading.Lock()
+clients: Dict[Tuple[str, float, float], httpx.Client] = {}
+# endpoints of a multi-URL safeguard are called concurrently on a pool
+# shared by all safeguards
+pool: Optional[ThreadPoolExecutor] = None
+# last response of each endpoint, shared by all safeguards calling it, to
+# make conditional requests and, when asked, skip calls for a while
+cache_lock = threading.Lock()
+cache: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+# latency histogram of the calls made to each endpoint, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+latencies: Dict[str, Dict[str, Any]] = {}
+# when each endpoint last responded with a failure, on the monotonic clock
+failures: Dict[str, float] = {}
+
 
 def call_endpoint(
     url: str,
     auth: Optional[str] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    connect_timeout: float = 1.0,
+    read_timeout: float = 3.0,
+    max_age: Optional[float] = None,
+) -> bool:
+    """
+    Call the safeguard `url` and return whether it responded with a 200 and
+    an `ok` payload.
+
+    The endpoint is called with `If-None-Match` and `If-Modified-Since` when
+    a previous response carried an `ETag` or `Last-Modified` header, and a
+    304 reuses that response. When `max_age` is set, a response that is
+    younger than `max_age` seconds is reused without calling the endpoint.
+    """
+    try:
+        ok = check_endpoint(url, auth, connect_timeout, read_timeout, max_age)
+    except Exception:
+        record_failure(url)
+        raise
+
+    if not ok:
+        record_failure(url)
+
+    return ok
+
+
+def call_endpoints(
+    urls: List[str],
+    auth: Optional[str] = None,
+    quorum: Union[str, int] = "any",
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+    connect_timeout: float = 1.0,
+    read_timeout: float = 3.0,
+    max_age: Optional[float] = None,
+) -> bool:
+    """
+    Call all the `urls` concurrently and return `False` when enough of them
+    failed to reach the `quorum`: `"any"` (one failure is enough), `"all"`
+    or a number of failures.
+    """
+    if not urls:
+        return True
+
+    futures = [
+        get_pool().submit(
+            call_endpoint,
+            url,
+            auth,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            max_age=max_age,
+        )
+        for url in urls
+    ]
+
+    failed = 0
+    for url, f in zip(urls, futures):
+        try:
+            ok = f.result()
+        except Exception:
+            logger.critical(f"Safeguard endpoint '{url}' failed", exc_info=True)
+            ok = False
+        failed += 0 if ok else 1
+
+    threshold = get_quorum(quorum, len(urls))
+    if failed >= threshold:
+        logger.critical(
+            f"{failed} out of {len(urls)} safeguard endpoints failed"
+        )
+        return False
+
+    return True
+
+
+def close_clients() -> None:
+    global pool
+
+    with clients_lock:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = None
+
+        for client in clients.values():
+            try:
+                client.close()
+            except Exception:
+                logger.debug("Failed to close safeguard client", exc_info=True)
+        clients.clear()
+
+    with cache_lock:
+        cache.clear()
+        latencies.clear()
+        failures.clear()
+
+
+def get_failed_at(urls: List[str]) -> Optional[float]:
+    """
+    When the most recent failing response of these endpoints was received,
+    on the monotonic clock.
+    """
+    with cache_lock:
+        received = [failures[url] for url in urls if url in failures]
+
+    return max(received) if received else None
+
+
+def get_latencies() -> Dict[str, Dict[str, Any]]:
+    """
+    Latency histogram of the calls made to each endpoint so far: the upper
+    bound of each bucket, in seconds, the number of calls that fell in each
+    of them (the last one is unbounded) along with their count, sum and max.
+    """
+    with cache_lock:
+        return {
+            url: dict(h, counts=list(h["counts"]))
+            for url, h in latencies.items()
+        }
+
+
+###############################################################################
+# Private functions
+###############################################################################
+def check_endpoint(
+    url: str,
+    auth: Optional[str],
+    connect_timeout: float,
+    read_timeout: float,
+    max_age: Optional[float],
 ) -> bool:
+    key = (url, auth)
+    with cache_lock:
+        cached = cache.get(key)
+
+    if cached and max_age and time.monotonic() - cached["at"] < max_age:
+        return check_result(cached["result"])
+
     headers = {}
     if auth:
         headers["Authorization"] = auth
 
-    r = httpx.get(url, headers=headers)
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    client = get_client(url, connect_timeout, read_timeout)
+    started = time.monotonic()
+    try:
+        r = client.get(url, headers=headers)
+    finally:
+        record_latency(url, time.monotonic() - started)
+
+    if r.status_code == 304 and cached:
+        with cache_lock:
+            cached["at"] = time.monotonic()
+        return check_result(cached["result"])
+
     if r.status_code != 200:
+        with cache_lock:
+            cache.pop(key, None)
         logger.critical("Safeguard endpoint returned a non 200 response")
         return False
 
     result = r.json()
+    etag = r.headers.get("ETag")
+    last_modified = r.headers.get("Last-Modified")
+    with cache_lock:
+        # another safeguard may rely on this entry to skip calls for a while,
+        # whether or not this one does
+        keep = bool(max_age) or bool(cache.get(key, {}).get("max_age"))
+        if etag or last_modified or keep:
+            cache[key] = {
+                "at": time.monotonic(),
+                "etag": etag,
+                "last_modified": last_modified,
+                "result": result,
+                "max_age": keep,
+            }
+        else:
+            cache.pop(key, None)
+
+    return check_result(result)
+
+
+def record_failure(url: str) -> None:
+    with cache_lock:
+        failures[url] = time.monotonic()
+
+
+def record_latency(url: str, duration: float) -> None:
+    with cache_lock:
+        h = latencies.get(url)
+        if h is None:
+            h = latencies[url] = {
+                "buckets": list(LATENCY_BUCKETS),
+                "counts": [0] * (len(LATENCY_BUCKETS) + 1),
+                "count": 0,
+                "sum": 0.0,
+                "max": 0.0,
+            }
+
+        h["counts"][bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+        h["count"] += 1
+        h["sum"] += duration
+        h["max"] = max(h["max"], duration)
+
+
+def check_result(result: Dict[str, Any]) -> bool:
     if not result.get("ok"):
         logger.critical(
             f"Safeguard endpoint returned with an error: {result['error']}"
@@ -31,3 +250,49 @@ def call_endpoint(
         return False
 
     return True
+
+
+def get_pool() -> ThreadPoolExecutor:
+    global pool
+
+    with clients_lock:
+        if pool is None:
+            pool = ThreadPoolExecutor(
+                max_workers=16, thread_name_prefix="reliably-safeguard"
+            )
+        return pool
+
+
+def get_quorum(quorum: Union[str, int], count: int) -> int:
+    """
+    Number of failing endpoints, out of `count`, that trip the safeguard.
+    """
+    if quorum == "all":
+        return count
+
+    if quorum == "any":
+        return 1
+
+    return min(max(int(quorum), 1), count)
+
+
+def get_client(
+    url: str, connect_timeout: float, read_timeout: float
+) -> httpx.Client:
+    key = (url, connect_timeout, read_timeout)
+    with clients_lock:
+        client = clients.get(key)
+        if client is None:
+            client = httpx.Client(
+                timeout=httpx.Timeout(
+                    read_timeout, connect=connect_timeout, pool=connect_timeout
+                ),
+                limits=httpx.Limits(
+                    max_connections=4,
+                    max_keepalive_connections=2,
+                    keepalive_expiry=60,
+                ),
+            )
+            clients[key] = client
+
+    return client
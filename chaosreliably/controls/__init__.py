@@ -2,7 +2,9 @@ import logging
 import os
 import secrets
 import threading
-from typing import Any, Dict, Optional, Type, Union, cast
+import time
+from functools import partial
+from typing import Any, Dict, List, Optional, Type, Union, cast
 
 from chaosaddons.controls import safeguards
 from chaoslib.run import EventHandlerRegistry, RunEventHandler
@@ -14,6 +16,13 @@ from chaoslib.types import (
     Secrets,
 )
 
+from chaosreliably.activities.safeguard.probes import (
+    close_clients,
+    get_failed_at,
+    get_latencies,
+)
+from chaosreliably.controls.scheduler import ScheduledJob, scheduler
+
 logger = logging.getLogger("chaostoolkit")
 global_lock = threading.Lock()
 
@@ -26,25 +35,61 @@ class ReliablyGuardian(safeguards.Guardian):  # type: ignore
 class ReliablySafeguardGuardian:
     def __init__(
         self,
-        url: Union[str, Dict[str, str]],
+        url: Union[str, Dict[str, str], List[Union[str, Dict[str, str]]]],
         auth: Optional[Union[str, Dict[str, str]]],
         frequency: Optional[Union[float, Dict[str, str]]],
         guardian_class: Type[safeguards.Guardian] = ReliablyGuardian,
+        quorum: Union[str, int, Dict[str, str]] = "any",
+        max_age: Optional[Union[float, Dict[str, str]]] = None,
     ) -> None:
         self.probes = []
         self.frequency = frequency
         self.guardian = guardian_class()
-
-        url = get_value(url)  # type: ignore
+        self.job: Optional[ScheduledJob] = None
+        # set once the guardian must no longer act on its checks. Unlike the
+        # job, it exists before a precheck can possibly run
+        self.stopped = threading.Event()
+        self.tripped_at = None  # type: Optional[float]
+        self.trip_to_exit = None  # type: Optional[float]
+
+        urls = [get_value(u) for u in (url if isinstance(url, list) else [url])]
+        urls = [u for u in urls if u]
+        self.urls = cast(List[str], urls)
         auth = get_value(auth)  # type: ignore
-
-        if not url:
+        if isinstance(quorum, dict):
+            quorum = get_value(quorum) or "any"
+        if quorum not in ("any", "all"):
+            try:
+                int(quorum)
+            except (TypeError, ValueError):
+                logger.warning(
+                    f"Invalid safeguard quorum '{quorum}', using 'any' instead"
+                )
+                quorum = "any"
+
+        if not urls:
             logger.debug("Missing URL for safeguard/precheck call.")
             return None
 
         if frequency is not None:
             frequency = max(float(get_value(frequency)), 0.3)  # type: ignore
 
+        if len(urls) == 1:
+            func = "call_endpoint"
+            arguments = {
+                "url": urls[0],
+                "auth": auth,
+            }  # type: Dict[str, Any]
+        else:
+            # a single probe calls all the endpoints concurrently so they
+            # are evaluated together against the quorum
+            func = "call_endpoints"
+            arguments = {"urls": urls, "auth": auth, "quorum": quorum}
+
+        if max_age:
+            arguments["max_age"] = float(get_value(max_age))  # type: ignore
+
+        url = ", ".join(urls)  # type: ignore
         name = f"precheck-{secrets.token_hex(8)}"
         self.probes.append(
             {
@@ -54,8 +99,8 @@ class ReliablySafeguardGuardian:
                 "provider": {
                     "type": "python",
                     "module": "chaosreliably.activities.safeguard.probes",
-                    "func": "call_endpoint",
-                    "arguments": {"url": url, "auth": auth},
+                    "func": func,
+                    "arguments": arguments,
                 },
             }
         )
@@ -74,16 +119,97 @@ class ReliablySafeguardGuardian:
         configuration: Configuration,
         secrets: Secrets,
     ) -> None:
-        if self.probes:
-            self.guardian.run(
+        if not self.probes:
+            return None
+
+        # rather than the guardian's own executors, probes run from the
+        # scheduler shared by all safeguards and prechecks. Safeguards are
+        # first checked after one period, as the guardian used to, but their
+        # outcome is then evaluated right away
+        probe = self.probes[0]
+        frequency = cast(Optional[float], probe.get("frequency"))
+        checked = threading.Event()
+        self.job = scheduler.schedule(
+            partial(
+                self._check,
                 experiment,
-                self.probes,
+                probe,
                 configuration or {},
                 secrets or {},
-                None,
+                checked,
+            ),
+            frequency=frequency,
+            delay=frequency or 0.0,
+        )
+
+        if not frequency:
+            # prechecks block the execution until they are done
+            checked.wait()
+
+    def _check(
+        self,
+        experiment: Experiment,
+        probe: Dict[str, Any],
+        configuration: Configuration,
+        secrets: Secrets,
+        checked: threading.Event,
+    ) -> None:
+        try:
+            run = safeguards.execute_activity(
+                experiment=experiment,
+                probe=probe,
+                configuration=configuration,
+                secrets=secrets,
             )
+        finally:
+            checked.set()
+
+        if self.stopped.is_set():
+            return None
+
+        safeguards.interrupt_experiment_on_unhealthy_probe(
+            self.guardian, probe, run, configuration, secrets
+        )
+
+        if self.guardian.was_triggered:
+            # the clock starts when the failing response was received and
+            # stops once the execution tells us it was interrupted
+            self.tripped_at = get_failed_at(self.urls) or time.monotonic()
+            if self.job is not None:
+                scheduler.cancel(self.job, wait=False)
+            # interrupting from this very run means waiting for the job to
+            # be idle is also waiting for the interruption
+            self.guardian._wait_interruption()
+
+    def interrupted(self, at: float) -> None:
+        """
+        Record that the execution was interrupted at `at`, on the monotonic
+        clock, when this guardian is the one that interrupted it.
+        """
+        if self.tripped_at is None or self.trip_to_exit is not None:
+            return None
+
+        self.trip_to_exit = max(at - self.tripped_at, 0.0)
+        logger.debug(
+            f"Execution interrupted {self.trip_to_exit:.3f}s after the "
+            "safeguard failed"
+        )
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.job is not None:
+            scheduler.cancel(self.job, wait=False)
 
     def finish(self, journal: Journal) -> None:
+        self.stopped.set()
+        if self.job is not None:
+            scheduler.cancel(self.job, timeout=30)
+
+        if self.guardian.interrupted:
+            # the execution never told us it was interrupted, finishing is
+            # the closest we know of
+            self.interrupted(time.monotonic())
+
         self.guardian.terminate()
 
         with global_lock:
@@ -94,6 +220,15 @@ class ReliablySafeguardGuardian:
                 trig_probes = integration.setdefault("triggered_probes", [])
                 trig_probes.append(self.guardian.triggered_by_run)
 
+                interruptions = integration.setdefault("interruptions", [])
+                interruptions.append(
+                    {
+                        "probe": self.guardian.triggered_by,
+                        "failed_at": self.guardian.triggered_by_run.get("end"),
+                        "trip_to_exit": self.trip_to_exit,
+                    }
+                )
+
 
 class ReliablySafeguardHandler(RunEventHandler):  # type: ignore
     def __init__(self) -> None:
@@ -144,17 +279,43 @@ class ReliablySafeguardHandler(RunEventHandler):  # type: ignore
             for g in self.guardians:
                 g.start(experiment, configuration, secrets)
 
+    def interrupted(self, experiment: Experiment, journal: Journal) -> None:
+        self._interrupted()
+
+    def signal_exit(self) -> None:
+        self._interrupted()
+
+    def _interrupted(self) -> None:
+        at = time.monotonic()
+        with self._lock:
+            for g in self.guardians:
+                g.interrupted(at)
+
     def finish(self, journal: Journal) -> None:
         if not self.initialized:
             return None
 
         with self._lock:
+            # stop them all first so none keeps running while another one
+            # is finishing
+            for g in self.guardians:
+                g.stop()
+
             for g in self.guardians:
                 try:
                     g.finish(journal)
                 except Exception:
                     logger.debug("Guardian somehow failed", exc_info=True)
 
+        latencies = get_latencies()
+        if latencies:
+            with global_lock:
+                x = journal["experiment"]
+                integration = get_integration_from_extension(x, "safeguards")
+                integration["latencies"] = latencies
+
+        close_clients()
+
     def add(self, guardian: ReliablySafeguardGuardian) -> None:
         if not self.initialized:
             return None
@@ -174,15 +335,22 @@ def initialize(
 
 
 def register(
-    url: Union[str, Dict[str, str]],
+    url: Union[str, Dict[str, str], List[Union[str, Dict[str, str]]]],
     auth: Optional[Union[str, Dict[str, str]]] = None,
     frequency: Optional[Union[float, Dict[str, str]]] = None,
     handler: Optional[ReliablySafeguardHandler] = None,
     guardian_class: Type[safeguards.Guardian] = ReliablyGuardian,
+    quorum: Union[str, int, Dict[str, str]] = "any",
+    max_age: Optional[Union[float, Dict[str, str]]] = None,
 ) -> None:
     (handler or proxy).add(
         ReliablySafeguardGuardian(
-            url, auth, frequency, guardian_class=guardian_class
+            url,
+            auth,
+            frequency,
+            guardian_class=guardian_class,
+            quorum=quorum,
+            max_age=max_age,
         )
     )
 
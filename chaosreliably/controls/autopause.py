@@ -1,7 +1,7 @@
 import logging
 import os
 import secrets
-from typing import Any, Dict, Union
+from typing import Any, Dict, List, Union
 
 from chaoslib.types import Activity, Configuration, Experiment, Secrets
 
@@ -29,52 +29,86 @@ def configure_control(
 def amend_experiment_for_autopauses(
     experiment: Experiment, autopause: AutoPause
 ) -> None:
-    method = experiment.get("method")
-    if method and "method" in autopause:
+    sections = {
+        "method": experiment.get("method"),
+        "steady-state-hypothesis": experiment.get(
+            "steady-state-hypothesis", {}
+        ).get("probes"),
+        "rollbacks": experiment.get("rollbacks"),
+    }
+    sections = {name: a for name, a in sections.items() if a}
+    durations = resolve_autopause(autopause)
+
+    plan = make_plan(sections, durations)
+    for name, layout in plan.items():
+        activities = sections[name]
+        activities[:] = [
+            activities[x] if isinstance(x, int) else make_pause(x)
+            for x in layout
+        ]
+
+
+def resolve_autopause(
+    autopause: AutoPause,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Resolve the pause durations per section and, for each of them, per
+    type of activity to follow with a pause (`"*"` for all activities).
+    """
+    durations = {}  # type: Dict[str, Dict[str, float]]
+
+    if "method" in autopause:
         p = autopause["method"]
+        method = {}
         if is_enabled(p.get("actions", {}).get("enabled")):
-            pause_duration = get_duration(
+            method["action"] = get_duration(
                 p.get("actions", {}).get("pause_duration", 0)
             )
 
-            activities = method[:]
-            for index, activity in enumerate(activities):
-                index = method.index(activity)
-                if activity["type"] == "action":
-                    method.insert(index + 1, make_pause(pause_duration))
-
         if is_enabled(p.get("probes", {}).get("enabled")):
-            pause_duration = get_duration(
+            method["probe"] = get_duration(
                 p.get("probes", {}).get("pause_duration", 0)
             )
 
-            activities = method[:]
-            for index, activity in enumerate(activities):
-                index = method.index(activity)
-                if activity["type"] == "probe":
-                    method.insert(index + 1, make_pause(pause_duration))
-
-    ssh_probes = experiment.get("steady-state-hypothesis", {}).get("probes")
-    if ssh_probes and "steady-state-hypothesis" in autopause:
-        p = autopause["steady-state-hypothesis"]
-        if is_enabled(p["enabled"]):
-            pause_duration = get_duration(p.get("pause_duration", 0))
-
-            activities = ssh_probes[:]
-            for index, activity in enumerate(activities):
-                index = ssh_probes.index(activity)
-                ssh_probes.insert(index + 1, make_pause(pause_duration))
-
-    rollbacks = experiment.get("rollbacks")
-    if rollbacks and "rollbacks" in autopause:
-        p = autopause["rollbacks"]
-        if is_enabled(p["enabled"]):
-            pause_duration = get_duration(p.get("pause_duration", 0))
-
-            activities = rollbacks[:]
-            for index, activity in enumerate(activities):
-                index = rollbacks.index(activity)
-                rollbacks.insert(index + 1, make_pause(pause_duration))
+        if method:
+            durations["method"] = method
+
+    for name in ("steady-state-hypothesis", "rollbacks"):
+        if name in autopause:
+            p = autopause[name]
+            if is_enabled(p["enabled"]):
+                durations[name] = {
+                    "*": get_duration(p.get("pause_duration", 0))
+                }
+
+    return durations
+
+
+def make_plan(
+    sections: Dict[str, List[Activity]],
+    durations: Dict[str, Dict[str, float]],
+) -> Dict[str, List[Union[int, float]]]:
+    """
+    Lay out, in a single pass per section, the index of each activity
+    followed, when needed, by the duration of its pause.
+    """
+    plan = {}
+    for name, activities in sections.items():
+        if name not in durations:
+            continue
+
+        d = durations[name]
+        layout = []  # type: List[Union[int, float]]
+        for index, activity in enumerate(activities):
+            layout.append(index)
+            if "*" in d:
+                layout.append(float(d["*"]))
+            elif activity["type"] in d:
+                layout.append(float(d[activity["type"]]))
+
+        plan[name] = layout
+
+    return plan
 
 
 def make_pause(pause_duration: float = 0) -> Activity:
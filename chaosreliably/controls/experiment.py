@@ -1,18 +1,36 @@
+import codecs
+import hashlib
 import json
 import logging
 import os
+import queue
+import random
 import secrets
+import sys
 import threading
 import time
 from copy import deepcopy
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, cast
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 try:
     import importlib_metadata as im
 except ImportError:
     import importlib.metadata as im  # type: ignore
 
+import httpx
 import orjson
 from chaoslib import substitute
 from chaoslib.exceptions import InterruptExecution
@@ -32,6 +50,10 @@ from chaoslib.types import (
 from chaosreliably import (
     RELIABLY_HOST,
     STREAM_LOG,
+    LogBuffer,
+    close_sessions,
+    compress_body,
+    get_request_encoding,
     get_session,
     get_shared_state,
 )
@@ -46,6 +68,9 @@ from chaosreliably.controls.vendors import (
 __all__ = ["configure_control"]
 logger = logging.getLogger("chaostoolkit")
 init_failed = threading.Event()
+JOURNAL_DOCUMENTS = ("result", "patch")
+packages_lock = threading.Lock()
+packages_cache = {}  # type: Dict[str, Dict[str, List[str]]]
 
 
 class ReliablyHandler(RunEventHandler):  # type: ignore
@@ -72,6 +97,8 @@ class ReliablyHandler(RunEventHandler):  # type: ignore
         self.paused_by_user_id = ""
         self.paused = False
         self.check_for_user_state = None  # type: Optional[threading.Thread]
+        self.journal_tracker = None  # type: Optional[JournalTracker]
+        self.uploader = None  # type: Optional[JournalUploader]
 
         register_vendors()
 
@@ -86,17 +113,19 @@ class ReliablyHandler(RunEventHandler):  # type: ignore
         logger.debug("Starting Reliably state checker now")
 
         url = f"/{org_id}/experiments/{exp_id}/executions/{exec_id}/state"
+        watcher = ExecutionStateWatcher(url)
         while not self.should_stop.is_set():
-            state = get_shared_state()
+            state = get_shared_state()  # type: Optional[Dict[str, Any]]
 
             if not state:
-                with get_session(configuration, secrets) as session:
-                    r = session.get(url)
-                    if r.status_code > 399:
-                        logger.debug(f"Failed to retrieve state: {r.json()}")
-                        continue
-
-                state = r.json()
+                try:
+                    with get_session(configuration, secrets) as session:
+                        state = watcher.fetch(session)
+                except Exception:
+                    if self.should_stop.is_set():
+                        break
+                    logger.debug("Failed to retrieve state", exc_info=True)
+                    watcher.failed()
 
             if state:
                 if state["current"] == "terminate":
@@ -164,13 +193,9 @@ class ReliablyHandler(RunEventHandler):  # type: ignore
                                 f"by {username}"
                             )
 
-            now = time.time()
-            later = now + 10
-            while time.time() < later:
-                time.sleep(0.5)
-                if self.should_stop.is_set():
-                    logger.debug("Stopping Reliably state checker now")
-                    break
+            if self.should_stop.wait(watcher.next_delay()):
+                logger.debug("Stopping Reliably state checker now")
+                break
 
     def running(
         self,
@@ -186,6 +211,7 @@ class ReliablyHandler(RunEventHandler):  # type: ignore
         self.secrets = secrets
         self.journal = journal
         self.plan_id = os.getenv("RELIABLY_PLAN_ID")
+        self.journal_tracker = make_journal_tracker(configuration)
 
         capture.start_capturing(self.experiment, configuration, secrets)
 
@@ -249,9 +275,20 @@ class ReliablyHandler(RunEventHandler):  # type: ignore
                     configuration,
                     secrets,
                 ),
+                daemon=True,
             )
             self.check_for_user_state.start()
 
+            self.uploader = JournalUploader(
+                self.org_id,
+                self.exp_id,
+                self.exec_id,
+                configuration,
+                secrets,
+                self.journal_tracker,
+            )
+            self.uploader.start()
+
             apply_vendors(
                 "started",
                 experiment=experiment,
@@ -275,6 +312,12 @@ class ReliablyHandler(RunEventHandler):  # type: ignore
             self.check_for_user_state.join(timeout=3)
             self.check_for_user_state = None
 
+        if self.uploader:
+            # once stopped, the uploader drops whatever it has not sent yet
+            # so it cannot overwrite the results we are about to send
+            self.uploader.stop(timeout=30)
+            self.uploader = None
+
         with global_lock:
             self.current_activities = []
 
@@ -291,14 +334,12 @@ class ReliablyHandler(RunEventHandler):  # type: ignore
                 if not init_failed.is_set():
                     logger.info("Finished Reliably execution. Bye!")
 
-                    log = STREAM_LOG.getvalue()
-
                     complete_run(
                         self.org_id,
                         self.exp_id,
                         self.exec_id,
                         journal,
-                        log,
+                        STREAM_LOG,
                         self.configuration,
                         self.secrets,
                     )
@@ -336,8 +377,12 @@ class ReliablyHandler(RunEventHandler):  # type: ignore
                 self.experiment = self.configuration = self.secrets = (
                     self.journal
                 ) = None
+                self.journal_tracker = None
 
                 init_failed.clear()
+                close_sessions()
+                STREAM_LOG.reset()
+                journal_encoder.clear()
 
     def start_hypothesis_before(self, experiment: Experiment) -> None:
         with self.check_lock:
@@ -400,14 +445,8 @@ class ReliablyHandler(RunEventHandler):  # type: ignore
                 }
                 self.extension["pauses"].append(pause)
 
-        send_journal(
-            self.org_id,
-            self.exp_id,
-            self.exec_id,
-            self.journal,
-            self.configuration,
-            self.secrets,
-        )
+        if self.uploader:
+            self.uploader.submit(self.journal)
 
     def activity_completed(self, activity: Activity, run: Run) -> None:
         name = activity.get("name")
@@ -454,15 +493,454 @@ class ReliablyHandler(RunEventHandler):  # type: ignore
 
                     logger.info("No longer paused")
 
-        send_journal(
-            self.org_id,
-            self.exp_id,
-            self.exec_id,
-            self.journal,
-            self.configuration,
-            self.secrets,
+        if self.uploader:
+            self.uploader.submit(self.journal)
+
+
+class JournalTracker:
+    """
+    Remember what was last successfully pushed to Reliably so subsequent
+    uploads only carry what changed since then, as a JSON Patch document,
+    along with the log lines that were written in the meantime.
+
+    Top-level lists of the journal, such as `run` or `rollbacks`, only grow
+    so their new entries are sent, along with the entries that changed since
+    they were sent, such as runs completed in place by chaoslib. Every other
+    section is sent whenever its serialized form differs from the last push.
+
+    Every `checkpoint_every` patches, the full journal is sent again. When
+    not `enabled`, the journal is always sent in full and only the log
+    offset is tracked.
+    """
+
+    def __init__(
+        self, checkpoint_every: int = 20, enabled: bool = True
+    ) -> None:
+        self.checkpoint_every = checkpoint_every
+        self.sections = {}  # type: Dict[str, bytes]
+        self.items = {}  # type: Dict[str, List[bytes]]
+        self.log_offset = 0
+        self.patches_since_checkpoint = 0
+        self.enabled = enabled
+
+    @property
+    def lengths(self) -> Dict[str, int]:
+        return {key: len(items) for key, items in self.items.items()}
+
+    def needs_checkpoint(self) -> bool:
+        if not self.sections and not self.items:
+            return True
+
+        return self.patches_since_checkpoint >= self.checkpoint_every
+
+    def diff(
+        self, state: Journal
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, bytes], Dict[str, List[bytes]]]:
+        ops = []  # type: List[Dict[str, Any]]
+        sections = {}  # type: Dict[str, bytes]
+        items = {}  # type: Dict[str, List[bytes]]
+
+        # the journal may be mutated by the experiment while we look at it
+        for key, value in list(state.items()):
+            path = f"/{escape_json_pointer(key)}"
+
+            if isinstance(value, list):
+                value = list(value)
+                encoded = [journal_encoder.encode_run(i) for i in value]
+                items[key] = encoded
+                sent = self.items.get(key)
+                if sent is None or len(sent) > len(value):
+                    ops.append({"op": "add", "path": path, "value": value})
+                    continue
+
+                for index, previous in enumerate(sent):
+                    if encoded[index] != previous:
+                        ops.append(
+                            {
+                                "op": "replace",
+                                "path": f"{path}/{index}",
+                                "value": value[index],
+                            }
+                        )
+                for item in value[len(sent) :]:
+                    ops.append(
+                        {"op": "add", "path": f"{path}/-", "value": item}
+                    )
+                continue
+
+            section = journal_encoder.encode_section(key, value)
+            sections[key] = section
+            if self.sections.get(key) != section:
+                ops.append({"op": "add", "path": path, "value": value})
+
+        for key in set(self.sections).union(self.items):
+            if key not in state:
+                path = f"/{escape_json_pointer(key)}"
+                ops.append({"op": "remove", "path": path})
+
+        return (ops, sections, items)
+
+    def commit(
+        self,
+        sections: Dict[str, bytes],
+        items: Dict[str, List[bytes]],
+        log_offset: int,
+    ) -> None:
+        self.sections = sections
+        self.items = items
+        self.log_offset = log_offset
+        self.patches_since_checkpoint += 1
+
+    def checkpoint(self, state: Journal, log_offset: int) -> None:
+        self.sections = {}
+        self.items = {}
+        for key, value in state.items():
+            if isinstance(value, list):
+                self.items[key] = [journal_encoder.encode_run(i) for i in value]
+            else:
+                self.sections[key] = journal_encoder.encode_section(key, value)
+
+        self.log_offset = log_offset
+        self.patches_since_checkpoint = 0
+
+
+class JournalEncoder:
+    """
+    Encode journals as compact JSON, reusing the encoded form of the parts
+    that do not change once they have been added: the activities of the
+    experiment and the finished runs of the journal. Everything else, such
+    as the status or the extensions, is encoded every time.
+
+    Runs are added to the journal as soon as their activity starts and are
+    filled in place once it completed, so a run is only cached once it has
+    a `duration`, the last field set by chaoslib.
+
+    Cached parts are kept referenced so their identity cannot be reused by
+    another object, call `clear` once the execution is finished.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cache = {}  # type: Dict[int, Tuple[Any, int, bytes]]
+
+    def encode(self, state: Journal) -> bytes:
+        with self._lock:
+            return encode_object(state, self._encode_journal_section)
+
+    def encode_section(self, key: str, value: Any) -> bytes:
+        with self._lock:
+            return self._encode_journal_section(key, value)
+
+    def encode_run(self, run: Any) -> bytes:
+        with self._lock:
+            return self._encode_run(run)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _encode_journal_section(self, key: str, value: Any) -> bytes:
+        if key == "experiment" and isinstance(value, dict):
+            return encode_object(value, self._encode_experiment_section)
+        elif key in ("run", "rollbacks") and isinstance(value, list):
+            return b"[" + b",".join(self._encode_run(r) for r in value) + b"]"
+
+        return to_compact_json(value)
+
+    def _encode_experiment_section(self, key: str, value: Any) -> bytes:
+        if key in ("method", "rollbacks") and isinstance(value, list):
+            return self._encode_items(value)
+        elif key == "steady-state-hypothesis" and isinstance(value, dict):
+            return encode_object(value, self._encode_hypothesis_section)
+
+        return to_compact_json(value)
+
+    def _encode_hypothesis_section(self, key: str, value: Any) -> bytes:
+        if key == "probes" and isinstance(value, list):
+            return self._encode_items(value)
+
+        return to_compact_json(value)
+
+    def _encode_items(self, items: List[Any]) -> bytes:
+        return b"[" + b",".join(self._encode_item(i) for i in items) + b"]"
+
+    def _encode_run(self, run: Any) -> bytes:
+        if not isinstance(run, dict) or "duration" not in run:
+            return to_compact_json(run)
+
+        return self._encode_item(run)
+
+    def _encode_item(self, item: Any) -> bytes:
+        if not isinstance(item, dict):
+            return to_compact_json(item)
+
+        # keys added by controls once the item was cached invalidate it
+        cached = self._cache.get(id(item))
+        if cached is None or cached[0] is not item or cached[1] != len(item):
+            cached = (item, len(item), to_compact_json(item))
+            self._cache[id(item)] = cached
+
+        return cached[2]
+
+
+journal_encoder = JournalEncoder()
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter for calls to the Reliably API.
+
+    Throttled (429) and unavailable (502, 503, 504) responses are retried,
+    honoring their `Retry-After` header when set. A 429 without that header
+    is a quota answer and is not retried, nor is a response asking to wait
+    for longer than `cap` seconds.
+
+    A 502 or 504, like a network error, doesn't tell whether the server
+    applied the request, so they are retried for idempotent methods only,
+    except for network errors when the request never reached the server.
+    Other methods are only retried on a 429 or 503 with a `Retry-After`.
+    """
+
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+    RETRY_STATUSES = (502, 503, 504)
+
+    def __init__(
+        self, retries: int = 3, base: float = 0.5, cap: float = 10.0
+    ) -> None:
+        self.retries = retries
+        self.base = base
+        self.cap = cap
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        response: Optional[httpx.Response] = None,
+        error: Optional[Exception] = None,
+    ) -> bool:
+        if attempt >= self.retries:
+            return False
+
+        if error is not None:
+            if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+                return True
+            return method.upper() in self.IDEMPOTENT_METHODS
+
+        if response is None:
+            return False
+
+        retry_after = get_retry_after(response)
+        if retry_after is not None and retry_after > self.cap:
+            return False
+
+        if response.status_code in (429, 503) and retry_after is not None:
+            return True
+
+        return (
+            method.upper() in self.IDEMPOTENT_METHODS
+            and response.status_code in self.RETRY_STATUSES
         )
 
+    def delay(
+        self, attempt: int, response: Optional[httpx.Response] = None
+    ) -> float:
+        retry_after = get_retry_after(response)
+        if retry_after is not None:
+            return retry_after
+
+        backoff = min(self.cap, self.base * (2.0**attempt))
+        return backoff / 2 + random.uniform(0, backoff / 2)  # nosec
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class ExecutionStateWatcher:
+    """
+    Fetch the execution state as soon as it changes on Reliably.
+
+    The server is asked to hold the request until the state differs from the
+    last one we saw, by sending its `ETag` in `If-None-Match` along with a
+    `Prefer: wait=<seconds>` header. When the server does not acknowledge the
+    preference with a `Preference-Applied` header, we fall back to polling:
+    quickly right after a change, then less and less often while the state
+    stays the same.
+
+    Only a 304 tells that the state is unchanged: the same state may be set
+    twice in a row, such as a pause after a resume we did not see, so every
+    state the server sends is returned.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        wait: int = 10,
+        min_interval: float = 1.0,
+        max_interval: float = 10.0,
+    ) -> None:
+        self.url = url
+        self.wait = wait
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self.long_poll = True
+        self.interval = min_interval
+        self.etag = None  # type: Optional[str]
+        self.last_state = None  # type: Optional[Dict[str, Any]]
+
+        self.retry_policy = RetryPolicy(cap=60.0)
+        self.failures = 0
+        self.retry_delay = 0.0
+
+    def fetch(self, session: httpx.Client) -> Optional[Dict[str, Any]]:
+        """
+        Return the state or `None` when the server told us it has not
+        changed.
+        """
+        headers = {}
+        timeout = session.timeout
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.long_poll:
+            headers["Prefer"] = f"wait={self.wait}"
+            timeout = httpx.Timeout(30, read=self.wait + 10)
+
+        r = session.get(self.url, headers=headers, timeout=timeout)
+
+        if r.status_code > 399:
+            logger.debug(f"Failed to retrieve state: {r.status_code}")
+            self.failed(r)
+            return None
+
+        self.failures = 0
+
+        if self.long_poll and "Preference-Applied" not in r.headers:
+            logger.debug("Long-polling the execution state is not supported")
+            self.long_poll = False
+
+        if r.status_code == 304:
+            self.backoff()
+            return None
+
+        self.etag = r.headers.get("ETag")
+        state = cast(Dict[str, Any], r.json())
+        if state == self.last_state:
+            self.backoff()
+        else:
+            self.interval = self.min_interval
+
+        self.last_state = state
+        return state
+
+    def backoff(self) -> None:
+        self.interval = min(self.interval * 2, self.max_interval)
+
+    def failed(self, response: Optional[httpx.Response] = None) -> None:
+        self.retry_delay = self.retry_policy.delay(self.failures, response)
+        self.failures += 1
+
+    def next_delay(self) -> float:
+        if self.failures:
+            return self.retry_delay
+
+        if self.long_poll:
+            return 0.0
+
+        return self.interval
+
+
+class JournalUploader:
+    """
+    Send the journal to Reliably from a background thread so activities do
+    not wait on a round-trip to the API.
+
+    Only the latest snapshot matters, so a pending snapshot that has not been
+    picked up yet by the worker is replaced by the new one.
+
+    Once stopped, the uploader is closed: pending snapshots are dropped and
+    a snapshot still being sent is not retried, so it cannot land after the
+    final results.
+    """
+
+    def __init__(
+        self,
+        org_id: str,
+        exp_id: str,
+        exec_id: Optional[str],
+        configuration: Configuration,
+        secrets: Secrets,
+        tracker: Optional[JournalTracker] = None,
+    ) -> None:
+        self.org_id = org_id
+        self.exp_id = exp_id
+        self.exec_id = exec_id
+        self.configuration = configuration
+        self.secrets = secrets
+        self.tracker = tracker
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=1)  # type: queue.Queue[Any]
+        self._closed = threading.Event()
+        self._t = threading.Thread(None, self._run, daemon=True)
+
+    def start(self) -> None:
+        self._t.start()
+
+    def submit(self, state: Journal) -> None:
+        if self._closed.is_set():
+            return None
+
+        with self._lock:
+            try:
+                self._queue.put_nowait(state)
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self._queue.put_nowait(state)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for pending snapshots to be sent, stop the worker and close the
+        uploader.
+        """
+        try:
+            if not self._t.is_alive():
+                return None
+
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                logger.debug("Journal uploader is stuck, not waiting for it")
+                return None
+
+            self._t.join(timeout=timeout)
+            if self._t.is_alive():
+                logger.debug("Journal uploader is still busy, closing it")
+        finally:
+            self._closed.set()
+
+    def _run(self) -> None:
+        while True:
+            state = self._queue.get()
+            if state is None or self._closed.is_set():
+                break
+
+            try:
+                send_journal(
+                    self.org_id,
+                    self.exp_id,
+                    self.exec_id,
+                    state,
+                    self.configuration,
+                    self.secrets,
+                    self.tracker,
+                    self._closed,
+                )
+            except Exception:
+                logger.debug("Failed to send journal", exc_info=True)
+
 
 def configure_control(
     experiment: Experiment,
@@ -529,9 +1007,11 @@ def create_run(
     plan_id = os.getenv("RELIABLY_PLAN_ID")
 
     with get_session(configuration, secrets) as session:
-        resp = session.post(
+        resp = call_api(
+            session,
+            "POST",
             f"/{org_id}/experiments/{exp_id}/executions",
-            json={"result": as_json(state), "plan_id": plan_id},
+            **make_upload(session, {"result": state, "plan_id": plan_id}),
         )
         if resp.status_code == 201:
             return cast(Dict[str, Any], resp.json())
@@ -550,7 +1030,7 @@ def complete_run(
     exp_id: str,
     execution_id: Optional[str],
     state: Journal,
-    log: str,
+    log: Union[str, LogBuffer],
     configuration: Configuration,
     secrets: Secrets,
 ) -> Optional[Dict[str, Any]]:
@@ -559,10 +1039,20 @@ def complete_run(
     status = state.get("status")
     logger.debug(f"Completing execution '{execution_id}' status: {status}")
 
+    payload = {"result": state, "plan_id": plan_id}
+    buffer = None
+    if isinstance(log, LogBuffer):
+        # stream the log rather than loading it all in memory
+        buffer = log
+    else:
+        payload["log"] = log
+
     with get_session(configuration, secrets) as session:
-        resp = session.put(
+        resp = call_api(
+            session,
+            "PUT",
             f"/{org_id}/experiments/{exp_id}/executions/{execution_id}/results",
-            json={"result": as_json(state), "log": log, "plan_id": plan_id},
+            **make_upload(session, payload, buffer),
         )
         if resp.status_code != 200:
             logger.error("Failed to update results on server")
@@ -576,21 +1066,317 @@ def send_journal(
     state: Journal,
     configuration: Configuration,
     secrets: Secrets,
+    tracker: Optional[JournalTracker] = None,
+    cancelled: Optional[threading.Event] = None,
 ) -> Optional[Dict[str, Any]]:
     plan_id = os.getenv("RELIABLY_PLAN_ID")
 
-    log = STREAM_LOG.getvalue()
+    if tracker and tracker.enabled and not tracker.needs_checkpoint():
+        if send_journal_patch(
+            org_id,
+            exp_id,
+            execution_id,
+            state,
+            tracker,
+            configuration,
+            secrets,
+            cancelled,
+        ):
+            return None
+
+    if cancelled is not None and cancelled.is_set():
+        return None
+
+    # only ship the log lines written since the last upload, the full log
+    # is sent once the execution completes
+    log_offset = tracker.log_offset if tracker else 0
+    log, next_log_offset = STREAM_LOG.read_from(log_offset)
 
     with get_session(configuration, secrets) as session:
-        resp = session.put(
+        resp = call_api(
+            session,
+            "PUT",
             f"/{org_id}/experiments/{exp_id}/executions/{execution_id}/results",
-            json={"result": as_json(state), "log": log, "plan_id": plan_id},
+            cancelled=cancelled,
+            **make_upload(
+                session,
+                {
+                    "result": state,
+                    "log": log,
+                    "log_offset": log_offset,
+                    "plan_id": plan_id,
+                },
+            ),
         )
         if resp.status_code != 200:
             logger.error("Failed to update results on server")
+        elif tracker and tracker.enabled:
+            tracker.checkpoint(state, next_log_offset)
+        elif tracker:
+            tracker.log_offset = next_log_offset
     return None
 
 
+def send_journal_patch(
+    org_id: str,
+    exp_id: str,
+    execution_id: Optional[str],
+    state: Journal,
+    tracker: JournalTracker,
+    configuration: Configuration,
+    secrets: Secrets,
+    cancelled: Optional[threading.Event] = None,
+) -> bool:
+    """
+    Send only the journal and log changes since the last successful upload.
+
+    Returns `False` when the patch could not be applied by the server so
+    the caller can fall back to a full upload. When the server does not
+    support patches at all, incremental uploads are disabled for the rest
+    of the execution.
+    """
+    plan_id = os.getenv("RELIABLY_PLAN_ID")
+
+    ops, sections, items = tracker.diff(state)
+    log_offset = tracker.log_offset
+    log_chunk, next_log_offset = STREAM_LOG.read_from(log_offset)
+
+    if not ops and not log_chunk:
+        return True
+
+    with get_session(configuration, secrets) as session:
+        resp = call_api(
+            session,
+            "PATCH",
+            f"/{org_id}/experiments/{exp_id}/executions/{execution_id}/results",
+            cancelled=cancelled,
+            **make_upload(
+                session,
+                {
+                    "patch": ops,
+                    "log": log_chunk,
+                    "log_offset": log_offset,
+                    "plan_id": plan_id,
+                },
+            ),
+        )
+        if resp.status_code in (404, 405, 415, 501):
+            logger.debug(
+                "Incremental journal uploads are not supported by the "
+                "server, falling back to full uploads"
+            )
+            tracker.enabled = False
+            return False
+        elif resp.status_code != 200:
+            logger.debug(
+                f"Failed to patch results on server: {resp.status_code}"
+            )
+            return False
+
+    tracker.commit(sections, items, next_log_offset)
+    return True
+
+
+def call_api(
+    session: httpx.Client,
+    method: str,
+    url: str,
+    retry_policy: Optional[RetryPolicy] = None,
+    content_factory: Optional[Callable[[], Iterator[bytes]]] = None,
+    cancelled: Optional[threading.Event] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    Call the Reliably API, retrying as set by `retry_policy` until
+    `cancelled` is set.
+    """
+    policy = retry_policy or DEFAULT_RETRY_POLICY
+    attempt = 0
+    while True:
+        response = None
+        error = None  # type: Optional[httpx.TransportError]
+        if content_factory:
+            # a streamed body can only be consumed once per attempt
+            kwargs["content"] = content_factory()
+        try:
+            response = session.request(method, url, **kwargs)
+        except httpx.TransportError as x:
+            if not policy.should_retry(method, attempt, error=x):
+                raise
+            error = x
+        else:
+            if not policy.should_retry(method, attempt, response=response):
+                return response
+
+        delay = policy.delay(attempt, response)
+        if cancelled is None:
+            logger.debug(f"Retrying {method} {url} in {delay:.2f}s")
+            time.sleep(delay)
+        elif cancelled.wait(delay):
+            logger.debug(f"Not retrying {method} {url}, call was cancelled")
+            if response is None:
+                raise error  # type: ignore
+            return response
+        attempt += 1
+
+
+def make_upload(
+    session: httpx.Client,
+    payload: Dict[str, Any],
+    log: Optional[LogBuffer] = None,
+) -> Dict[str, Any]:
+    """
+    Build the arguments of `call_api` to upload the given payload.
+
+    The `result` or `patch` entries of the payload are journal documents.
+    When the server advertised it accepts compressed request bodies, they
+    are embedded as compact JSON and the whole body is compressed. Otherwise,
+    they are sent as a JSON string, as older servers expect.
+
+    When a `log` buffer is given, it is streamed into the `log` entry.
+    """
+    encoding = get_request_encoding(session)
+
+    if encoding is None and log is None:
+        return {
+            "json": {
+                k: as_json(v) if k in JOURNAL_DOCUMENTS else v
+                for k, v in payload.items()
+            }
+        }
+
+    fields = {}
+    for key, value in payload.items():
+        if key in JOURNAL_DOCUMENTS and encoding is None:
+            fields[key] = orjson.dumps(as_json(value))
+        elif key in JOURNAL_DOCUMENTS:
+            fields[key] = encode_document(value)
+        else:
+            fields[key] = to_compact_json(value)
+
+    def make_body() -> Iterator[bytes]:
+        chunks = iter_json_body(fields, log.iter_from(0) if log else None)
+        if encoding:
+            return compress_body(chunks, encoding)
+        return chunks
+
+    headers = {"Content-Encoding": encoding} if encoding else {}
+    if log is None:
+        return {"content": b"".join(make_body()), "headers": headers}
+
+    return {"content_factory": make_body, "headers": headers}
+
+
+def iter_json_body(
+    fields: Dict[str, bytes], log: Optional[Iterator[bytes]] = None
+) -> Iterator[bytes]:
+    """
+    Generate a JSON object from already encoded values, streaming the log
+    into its `log` string when given.
+    """
+    yield b"{" + b",".join(
+        orjson.dumps(key) + b":" + value for key, value in fields.items()
+    )
+
+    if log is None:
+        yield b"}"
+        return None
+
+    yield b',"log":"' if fields else b'"log":"'
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in log:
+        text = decoder.decode(chunk)
+        if text:
+            yield orjson.dumps(text)[1:-1]
+
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield orjson.dumps(text)[1:-1]
+
+    yield b'"}'
+
+
+def get_retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+    if response is None:
+        return None
+
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def make_journal_tracker(
+    configuration: Configuration = None,
+) -> JournalTracker:
+    c = configuration or {}
+    incremental = c.get(
+        "reliably_incremental_uploads",
+        os.getenv("RELIABLY_INCREMENTAL_UPLOADS", "false").lower()
+        in ("true", "1", "t"),
+    )
+    checkpoint_every = int(
+        c.get(
+            "reliably_upload_checkpoint_every",
+            os.getenv("RELIABLY_UPLOAD_CHECKPOINT_EVERY", "20"),
+        )
+    )
+
+    return JournalTracker(
+        checkpoint_every=max(checkpoint_every, 1), enabled=incremental
+    )
+
+
+def escape_json_pointer(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def to_compact_json(value: Any) -> bytes:
+    try:
+        return orjson.dumps(value)
+    except TypeError as x:
+        # orjson doesn't support integers larger than 64 bits
+        # https://github.com/ijl/orjson/issues/116
+        if str(x) != "Integer exceeds 64-bit range":
+            raise
+
+    # only the subtree holding the large integer is encoded piece by piece
+    if isinstance(value, int):
+        return str(value).encode("utf-8")
+    elif isinstance(value, dict):
+        return encode_object(value, lambda k, v: to_compact_json(v))
+    elif isinstance(value, (list, tuple)):
+        return b"[" + b",".join(to_compact_json(v) for v in value) + b"]"
+
+    return json.dumps(value).encode("utf-8")
+
+
+def encode_object(
+    value: Dict[str, Any], encode_value: Callable[[str, Any], bytes]
+) -> bytes:
+    # the journal may be mutated by the experiment while we encode it
+    members = [
+        orjson.dumps(k) + b":" + encode_value(k, v)
+        for k, v in list(value.items())
+    ]
+    return b"{" + b",".join(members) + b"}"
+
+
 def get_reliably_extension_from_journal(journal: Journal) -> Dict[str, Any]:
     with global_lock:
         experiment = journal.get("experiment")
@@ -654,7 +1440,9 @@ def set_plan_status(
 
     logger.debug(f"Sending plan '{plan_id}' status: {status}")
     with get_session(configuration, secrets) as session:
-        r = session.put(
+        r = call_api(
+            session,
+            "PUT",
             f"/{org_id}/plans/{plan_id}/status",
             json={"status": status, "error": message},
         )
@@ -679,7 +1467,9 @@ def set_execution_state(
 
     logger.debug(f"Sending execution state: {state}")
     with get_session(configuration, secrets) as session:
-        r = session.put(
+        r = call_api(
+            session,
+            "PUT",
             f"/{org_id}/experiments/{exp_id}/executions/{exec_id}/state",
             json=state,
         )
@@ -697,21 +1487,87 @@ def to_datetime(ts: str) -> datetime:
 
 def add_runtime_info(experiment: Experiment, extension: Dict[str, Any]) -> None:
     x_mods = get_all_activities_modules(experiment)
-    dists = {d.name: (d.name, d.version) for d in im.distributions()}
-    pkgs = im.packages_distributions()
+    pkgs = get_packages_distributions(x_mods)
 
     extension["chaostoolkit_extensions"] = []
     for x_mod in x_mods:
-        if x_mod in pkgs:
-            for pkg in pkgs[x_mod]:
-                if pkg in dists:
-                    p = dists[pkg]
-                    extension["chaostoolkit_extensions"].append(
-                        {
-                            "name": p[0],
-                            "version": p[1],
-                        }
-                    )
+        for pkg in pkgs.get(x_mod, []):
+            version = get_distribution_version(pkg)
+            if version is not None:
+                extension["chaostoolkit_extensions"].append(
+                    {
+                        "name": pkg,
+                        "version": version,
+                    }
+                )
+
+
+def get_packages_distributions(modules: List[str]) -> Dict[str, List[str]]:
+    """
+    Map the given top-level modules to the distributions providing them.
+
+    Looking this up means reading the metadata of every installed package,
+    so the mapping is computed once per process and, when the
+    `RELIABLY_PACKAGES_CACHE` environment variable points to a file, stored
+    there until a directory of `sys.path` changes.
+    """
+    signature = get_sys_path_signature()
+
+    with packages_lock:
+        pkgs = packages_cache.get(signature)
+        if pkgs is None:
+            pkgs = load_packages_distributions(signature)
+            packages_cache.clear()
+            packages_cache[signature] = pkgs
+
+    return {m: pkgs[m] for m in modules if m in pkgs}
+
+
+def load_packages_distributions(signature: str) -> Dict[str, List[str]]:
+    cache_path = os.getenv("RELIABLY_PACKAGES_CACHE")
+    if cache_path:
+        try:
+            with open(cache_path, "rb") as f:
+                cached = orjson.loads(f.read())
+            if cached.get("signature") == signature:
+                return cast(Dict[str, List[str]], cached["packages"])
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logger.debug("Failed to read packages cache", exc_info=True)
+
+    pkgs = {k: list(v) for k, v in im.packages_distributions().items()}
+
+    if cache_path:
+        try:
+            with open(cache_path, "wb") as f:
+                f.write(
+                    orjson.dumps({"signature": signature, "packages": pkgs})
+                )
+        except Exception:
+            logger.debug("Failed to write packages cache", exc_info=True)
+
+    return pkgs
+
+
+@lru_cache(maxsize=256)
+def get_distribution_version(name: str) -> Optional[str]:
+    try:
+        return str(im.version(name))
+    except im.PackageNotFoundError:
+        return None
+
+
+def get_sys_path_signature() -> str:
+    # installing or removing a package changes the mtime of its directory
+    h = hashlib.sha256()
+    for path in sys.path:
+        try:
+            mtime = os.stat(path or ".").st_mtime_ns
+        except OSError:
+            continue
+        h.update(f"{path}:{mtime}\n".encode("utf-8"))
+    return h.hexdigest()
 
 
 def get_all_activities_modules(experiment: Experiment) -> List[str]:
@@ -738,18 +1594,18 @@ def get_all_activities_modules(experiment: Experiment) -> List[str]:
 
 def as_json(data: Any) -> Any:
     try:
-        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
-    except TypeError as x:
-        # orjson doesn't support integers larger than 64 bits
-        # https://github.com/ijl/orjson/issues/116
-        if str(x) == "Integer exceeds 64-bit range":
-            return json.dumps(data, indent=True)
-        raise
+        return encode_document(data).decode("utf-8")
     except Exception:
         logger.critical("Failed to serialize journal to json", exc_info=True)
         raise
 
 
+def encode_document(data: Any) -> bytes:
+    if isinstance(data, dict) and "experiment" in data:
+        return journal_encoder.encode(data)
+    return to_compact_json(data)
+
+
 def add_to_slack_message(url: str, experiment: Experiment) -> None:
     if os.getenv("SLACK_CHANNEL") is not None:
         c = experiment.setdefault("configuration", {})
@@ -0,0 +1,296 @@
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+try:
+    from opentelemetry import metrics as otel_metrics
+
+    HAS_OTEL_METRICS = True
+except ImportError:
+    HAS_OTEL_METRICS = False
+
+__all__ = ["make_exporter", "PrometheusExporter", "OTLPExporter"]
+logger = logging.getLogger("chaostoolkit")
+
+
+class SampleExporter(ABC):
+    """
+    Export metrics samples from a background thread, in batches of up to
+    `batch_size` samples or every `flush_interval` seconds.
+
+    Exporting never blocks the caller: when the queue is full, the sample is
+    dropped.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 1000,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._pending = queue.Queue(
+            maxsize=max_pending
+        )  # type: queue.Queue[Optional[Dict[str, Any]]]
+        self._t = threading.Thread(
+            None, self._run, name="reliably-metrics-exporter", daemon=True
+        )
+
+    def start(self) -> None:
+        self._t.start()
+
+    def export(self, sample: Dict[str, Any]) -> None:
+        try:
+            self._pending.put_nowait(sample)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        if self._t.is_alive():
+            # unlike samples, the sentinel must not be dropped, but we don't
+            # wait for it any longer than we'd wait for the thread
+            try:
+                self._pending.put(None, timeout=timeout)
+            except queue.Full:
+                logger.debug("Metrics exporter is stuck, not waiting for it")
+            else:
+                self._t.join(timeout=timeout)
+
+        if self.dropped:
+            logger.debug(f"{self.dropped} metrics samples were not exported")
+
+    @abstractmethod
+    def flush(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Export a batch of samples, called from the background thread.
+        """
+
+    def _run(self) -> None:
+        batch = []  # type: List[Dict[str, Any]]
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while not stopping:
+            try:
+                sample = self._pending.get(
+                    timeout=max(deadline - time.monotonic(), 0)
+                )
+                if sample is None:
+                    stopping = True
+                else:
+                    batch.append(sample)
+            except queue.Empty:
+                pass
+
+            if batch and (
+                stopping
+                or len(batch) >= self.batch_size
+                or time.monotonic() >= deadline
+            ):
+                try:
+                    self.flush(batch)
+                except Exception:
+                    logger.debug("Failed to export metrics", exc_info=True)
+                batch = []
+
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+
+class PrometheusExporter(SampleExporter):
+    """
+    Serve the latest metrics samples in the Prometheus text format on
+    `http://<host>:<port>/metrics` for as long as the measurement runs.
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 9464, **kwargs: Any
+    ) -> None:
+        SampleExporter.__init__(self, **kwargs)
+        self.lock = threading.Lock()
+        self.healthy = None  # type: Optional[bool]
+        self.outages = 0
+        self.probes = {}  # type: Dict[str, Dict[str, Any]]
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", "text/plain; version=0.0.4; charset=utf-8"
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._server_t = threading.Thread(
+            None,
+            self.server.serve_forever,
+            name="reliably-metrics-prometheus",
+            daemon=True,
+        )
+
+    @property
+    def port(self) -> int:
+        return int(self.server.server_address[1])
+
+    def start(self) -> None:
+        SampleExporter.start(self)
+        self._server_t.start()
+        logger.debug(f"Serving metrics on port {self.port}")
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        SampleExporter.close(self, timeout)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def flush(self, batch: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            for sample in batch:
+                self.healthy = sample["healthy"]
+                self.outages = sample["outages"]
+                for name, ok, latency in sample["probes"]:
+                    p = self.probes.setdefault(
+                        name,
+                        {"up": None, "latency": None, "passed": 0, "failed": 0},
+                    )
+                    p["up"] = bool(ok)
+                    p["latency"] = latency
+                    p["passed" if ok else "failed"] += 1
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            if self.healthy is not None:
+                lines.extend(
+                    [
+                        "# TYPE reliably_metrics_healthy gauge",
+                        f"reliably_metrics_healthy {int(self.healthy)}",
+                    ]
+                )
+            lines.extend(
+                [
+                    "# TYPE reliably_metrics_outages_total counter",
+                    f"reliably_metrics_outages_total {self.outages}",
+                    "# TYPE reliably_metrics_probe_up gauge",
+                ]
+            )
+            for name, p in self.probes.items():
+                if p["up"] is not None:
+                    lines.append(
+                        f'reliably_metrics_probe_up{{probe="{escape(name)}"}} '
+                        f"{int(p['up'])}"
+                    )
+            lines.append("# TYPE reliably_metrics_probe_latency_seconds gauge")
+            for name, p in self.probes.items():
+                if p["latency"] is not None:
+                    lines.append(
+                        "reliably_metrics_probe_latency_seconds"
+                        f'{{probe="{escape(name)}"}} {p["latency"]}'
+                    )
+            lines.append("# TYPE reliably_metrics_probe_samples_total counter")
+            for name, p in self.probes.items():
+                for outcome in ("passed", "failed"):
+                    lines.append(
+                        "reliably_metrics_probe_samples_total"
+                        f'{{probe="{escape(name)}",outcome="{outcome}"}} '
+                        f"{p[outcome]}"
+                    )
+
+        return "\n".join(lines) + "\n"
+
+
+class OTLPExporter(SampleExporter):
+    """
+    Record the metrics samples with the OpenTelemetry metrics API. They are
+    exported by the meter provider configured for the process, such as an
+    OTLP exporter.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        SampleExporter.__init__(self, **kwargs)
+        meter = otel_metrics.get_meter("chaosreliably")
+        self.samples = meter.create_counter(
+            "reliably.metrics.probe.samples",
+            description="Metrics probes samples by outcome",
+        )
+        self.latency = meter.create_histogram(
+            "reliably.metrics.probe.latency",
+            unit="s",
+            description="Latency of the metrics probes",
+        )
+        self.outages = meter.create_counter(
+            "reliably.metrics.outages",
+            description="Outages detected during the execution",
+        )
+        self.known_outages = 0
+
+    def flush(self, batch: List[Dict[str, Any]]) -> None:
+        for sample in batch:
+            for name, ok, latency in sample["probes"]:
+                outcome = "passed" if ok else "failed"
+                self.samples.add(1, {"probe": name, "outcome": outcome})
+                if latency is not None:
+                    self.latency.record(latency, {"probe": name})
+
+            if sample["outages"] > self.known_outages:
+                self.outages.add(sample["outages"] - self.known_outages)
+                self.known_outages = sample["outages"]
+
+
+def make_exporter(
+    exporter: Optional[str] = None, port: int = 9464
+) -> Optional[SampleExporter]:
+    """
+    Create and start the exporter named `exporter`, either `"prometheus"` or
+    `"otlp"`. Returns `None` when it's not set or cannot be created.
+    """
+    if not exporter:
+        return None
+
+    try:
+        if exporter == "prometheus":
+            e = PrometheusExporter(port=port)  # type: SampleExporter
+        elif exporter == "otlp":
+            if not HAS_OTEL_METRICS:
+                logger.warning(
+                    "Exporting metrics with OTLP requires the "
+                    "opentelemetry-api package"
+                )
+                return None
+            e = OTLPExporter()
+        else:
+            logger.warning(f"Unknown metrics exporter '{exporter}'")
+            return None
+    except OSError:
+        logger.warning("Failed to start the metrics exporter", exc_info=True)
+        return None
+
+    e.start()
+    return e
+
+
+def escape(value: str) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
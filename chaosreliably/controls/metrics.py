@@ -1,9 +1,11 @@
 import logging
 import threading
 import time
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from copy import deepcopy
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from chaoslib.activity import run_activity
 from chaoslib.exceptions import ActivityFailed
@@ -20,6 +22,7 @@ from chaoslib.types import (
 )
 
 from chaosreliably.controls import find_extension_by_name, global_lock
+from chaosreliably.controls.exporters import make_exporter
 
 __all__ = ["configure_control"]
 logger = logging.getLogger("chaostoolkit")
@@ -32,6 +35,11 @@ class MetricsHandler(RunEventHandler):  # type: ignore
         frequency: int = 30,
         recovery_timeout: int = 600,
         continue_until_recovered_or_timedout: bool = False,
+        probe_timeout: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        degraded_frequency: Optional[float] = None,
+        exporter: Optional[str] = None,
+        exporter_port: int = 9464,
     ) -> None:
         RunEventHandler.__init__(self)
 
@@ -39,6 +47,11 @@ class MetricsHandler(RunEventHandler):  # type: ignore
         self.frequency = frequency
         self.recovery_timeout = recovery_timeout
         self.block_execution = continue_until_recovered_or_timedout
+        self.probe_timeout = probe_timeout
+        self.max_workers = max_workers
+        self.degraded_frequency = degraded_frequency
+        self.exporter = exporter
+        self.exporter_port = exporter_port
 
         self.should_exit = threading.Event()
         self._t = None
@@ -65,6 +78,11 @@ class MetricsHandler(RunEventHandler):  # type: ignore
                 block_execution=self.block_execution,
                 configuration=configuration,
                 secrets=secrets,
+                probe_timeout=self.probe_timeout,
+                max_workers=self.max_workers,
+                degraded_frequency=self.degraded_frequency,
+                exporter=self.exporter,
+                exporter_port=self.exporter_port,
             ),
             daemon=True,
         )
@@ -76,7 +94,9 @@ class MetricsHandler(RunEventHandler):  # type: ignore
                 global_lock.acquire()
                 self.should_exit.set()
                 logger.debug("Waiting for metrics measurement to complete")
-                self._t.join(timeout=self.frequency + 2)
+                # the measurement wakes up as soon as it's told to exit so
+                # we only need to wait for an in-flight iteration
+                self._t.join(timeout=(self.probe_timeout or self.frequency) + 2)
             finally:
                 global_lock.release()
                 self._t = None
@@ -92,13 +112,46 @@ def configure_control(
     secrets: Secrets = None,
     settings: Settings = None,
     experiment: Experiment = None,
+    probe_timeout: Optional[float] = None,
+    max_workers: Optional[int] = None,
+    degraded_frequency: Optional[float] = None,
+    exporter: Optional[str] = None,
+    exporter_port: int = 9464,
 ) -> None:
+    """
+    Measure DORA metrics, such as the time to detect and recover from an
+    outage, by running the `probes` every `frequency` seconds in the
+    background. They default to the steady-state hypothesis probes.
+
+    Probes of an iteration run concurrently on up to `max_workers` threads
+    (as many as there are probes, up to 8, by default). A probe which has
+    not returned after `probe_timeout` seconds (`frequency` by default) is
+    considered as failing for that iteration.
+
+    When `degraded_frequency` is set, the probes run at that rate instead
+    while the system is deviating, so the recovery is timestamped more
+    precisely without probing at a high rate the rest of the time.
+
+    Set `exporter` to `"prometheus"` to serve the samples, as they are
+    measured, on `http://127.0.0.1:<exporter_port>/metrics` or to `"otlp"`
+    to record them with the OpenTelemetry meter provider of the process.
+    """
     if not probes:
         probes = experiment.get("steady-state-hypothesis", {}).get("probes", [])
         probes = deepcopy(probes)
 
     event_registry.register(
-        MetricsHandler(probes, frequency, recovery_timeout, block_execution)
+        MetricsHandler(
+            probes,
+            frequency,
+            recovery_timeout,
+            block_execution,
+            probe_timeout=probe_timeout,
+            max_workers=max_workers,
+            degraded_frequency=degraded_frequency,
+            exporter=exporter,
+            exporter_port=exporter_port,
+        )
     )
 
 
@@ -114,6 +167,11 @@ def compute_metrics(
     block_execution: bool = False,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    probe_timeout: Optional[float] = None,
+    max_workers: Optional[int] = None,
+    degraded_frequency: Optional[float] = None,
+    exporter: Optional[str] = None,
+    exporter_port: int = 9464,
 ) -> None:
     experiment = state["experiment"]
     extension = find_extension_by_name(experiment, "dora")
@@ -125,56 +183,68 @@ def compute_metrics(
     recovery_time = None
     went_over_timeout = None
 
+    series = MetricsSeries(probes, get_utc_now())
+    sample_exporter = make_exporter(exporter, exporter_port)
+
     execution_terminated = False
 
+    probe_timeout = probe_timeout or frequency
+    pool = ThreadPoolExecutor(
+        max_workers=max_workers or max(min(len(probes), 8), 1),
+        thread_name_prefix="reliably-metrics",
+    )
+    running = {}  # type: Dict[int, Future[Tuple[bool, datetime]]]
+
+    # iterations are scheduled on fixed ticks of a monotonic clock so that
+    # the time spent running the probes does not delay the next ones
+    next_tick = time.monotonic()
+
     try:
         while True:
-            all_fine_this_iteration = True
-            for probe in probes:
-                if should_exit.is_set():
-                    if not block_execution:
-                        logger.debug("Execution is complete, let's leave")
-                        return
-                    elif not execution_terminated:
-                        execution_terminated = True
-                        logger.debug(
-                            "Execution is complete, but checking system for "
-                            f"up to to {recovery_timeout}s"
-                        )
-
-                try:
-                    result = run_activity(probe, configuration, secrets)
-                except ActivityFailed:
-                    all_fine_this_iteration = False
-                    if detection_time is None:
-                        logger.debug("System state changed and is not healthy")
-                        detection_time = get_utc_now()
-                except Exception:
+            if should_exit.is_set():
+                if not block_execution:
+                    logger.debug("Execution is complete, let's leave")
+                    return
+                elif not execution_terminated:
+                    execution_terminated = True
                     logger.debug(
-                        f"Metrics probe '{probe['name']}' failed", exc_info=True
-                    )
-                else:
-                    tolerance = probe.get("tolerance")
-                    checked = within_tolerance(
-                        tolerance,
-                        result,
-                        configuration=configuration,
-                        secrets=secrets,
+                        "Execution is complete, but checking system for "
+                        f"up to to {recovery_timeout}s"
                     )
-                    if not checked:
-                        all_fine_this_iteration = False
-                        if detection_time is None:
-                            logger.debug(
-                                "System state changed and is not healthy"
-                            )
-                            detection_time = get_utc_now()
-
-            if all_fine_this_iteration and detection_time is not None:
-                recovery_time = get_utc_now()
+
+            healthy, failed_at, checked_at = run_probes(
+                pool,
+                probes,
+                running,
+                probe_timeout,
+                configuration,
+                secrets,
+                series=series,
+            )
+            series.mark(healthy, failed_at, checked_at)
+            if sample_exporter is not None:
+                sample_exporter.export(
+                    {
+                        "at": checked_at,
+                        "healthy": healthy,
+                        "outages": len(series.outages),
+                        "probes": series.last_samples(),
+                    }
+                )
+
+            if not healthy and detection_time is None:
+                logger.debug("System state changed and is not healthy")
+                detection_time = failed_at
+
+            if healthy and detection_time is not None and recovery_time is None:
+                recovery_time = checked_at
                 logger.debug("System state changed and is healthy again")
+
+            if healthy and execution_terminated:
+                logger.debug("System is healthy, no need to keep checking")
                 break
 
-            od = get_outage_duration(detection_time, get_utc_now())
+            od = get_outage_duration(series.outage_started(), get_utc_now())
             if od and od > recovery_timeout:
                 logger.info(
                     "System took longer than expected to come back to health"
@@ -182,11 +252,33 @@ def compute_metrics(
                 went_over_timeout = True
                 break
 
-            time.sleep(frequency)
+            interval = frequency  # type: float
+            if degraded_frequency and series.outage_started():
+                interval = degraded_frequency
+
+            next_tick, missed = get_next_tick(
+                next_tick, interval, time.monotonic()
+            )
+            if missed:
+                logger.debug(
+                    f"Metrics iteration took longer than {interval}s, "
+                    f"skipping {missed} tick(s)"
+                )
+
+            delay = max(next_tick - time.monotonic(), 0)
+            if execution_terminated:
+                time.sleep(delay)
+            else:
+                should_exit.wait(delay)
     finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        if sample_exporter is not None:
+            sample_exporter.close(timeout=2)
+
         duration = get_outage_duration(detection_time, recovery_time)
         if (
-            duration is not None
+            went_over_timeout is None
+            and duration is not None
             and (detection_time and recovery_time)
             and duration < recovery_timeout
         ):
@@ -202,6 +294,238 @@ def compute_metrics(
             "went_over_timeout": went_over_timeout,
             "timeout": recovery_timeout,
         }
+        extension["metrics"].update(series.to_dict(state.get("run")))
+
+
+def run_probes(
+    pool: ThreadPoolExecutor,
+    probes: List[Probe],
+    running: Dict[int, Future[Tuple[bool, datetime]]],
+    timeout: float,
+    configuration: Configuration = None,
+    secrets: Secrets = None,
+    series: Optional["MetricsSeries"] = None,
+) -> Tuple[bool, Optional[datetime], datetime]:
+    """
+    Run one iteration of all the probes concurrently and wait for them up to
+    `timeout` seconds.
+
+    Returns whether they were all fine, when the first failure was seen and
+    when the last probe completed. A probe that is still running from a
+    previous iteration is not started again and counts as failing.
+
+    When a `series` is given, the outcome and latency of each probe is
+    appended to it.
+    """
+    healthy = True
+    failures = []
+    started_at = checked_at = get_utc_now()
+
+    futures = {}
+    for index, probe in enumerate(probes):
+        previous = running.get(index)
+        if previous is not None and not previous.done():
+            logger.debug(f"Metrics probe '{probe['name']}' is still running")
+            healthy = False
+            failures.append(get_utc_now())
+            continue
+
+        futures[index] = pool.submit(
+            evaluate_probe, probe, configuration, secrets
+        )
+    running.update(futures)
+
+    done, not_done = wait(futures.values(), timeout=timeout)
+    if not_done:
+        logger.debug(f"{len(not_done)} metrics probe(s) went over {timeout}s")
+        healthy = False
+        failures.append(get_utc_now())
+
+    samples = [(None, None)] * len(
+        probes
+    )  # type: List[Tuple[Optional[bool], Optional[float]]]
+    for index, future in futures.items():
+        if future not in done:
+            continue
+
+        ok, finished_at = future.result()
+        checked_at = max(checked_at, finished_at)
+        samples[index] = (ok, (finished_at - started_at).total_seconds())
+        if not ok:
+            healthy = False
+            failures.append(finished_at)
+
+    if series is not None:
+        series.append(started_at, samples)
+
+    return (healthy, min(failures) if failures else None, checked_at)
+
+
+def evaluate_probe(
+    probe: Probe, configuration: Configuration = None, secrets: Secrets = None
+) -> Tuple[bool, datetime]:
+    try:
+        result = run_activity(probe, configuration, secrets)
+    except ActivityFailed:
+        return (False, get_utc_now())
+    except Exception:
+        logger.debug(f"Metrics probe '{probe['name']}' failed", exc_info=True)
+        return (True, get_utc_now())
+
+    tolerance = probe.get("tolerance")
+    checked = within_tolerance(
+        tolerance,
+        result,
+        configuration=configuration,
+        secrets=secrets,
+    )
+    return (bool(checked), get_utc_now())
+
+
+class MetricsSeries:
+    """
+    Time series of the metrics iterations, kept as columns: the offset in
+    seconds of each iteration from the start and, for each probe, whether it
+    passed (-1 when it did not complete) and its latency (-1 when unknown).
+
+    Outages are tracked as they are detected so a run can have many of them.
+    """
+
+    def __init__(self, probes: List[Probe], started: datetime) -> None:
+        self.started = started
+        self.names = [p.get("name") for p in probes]
+        self.offsets = array("d")
+        self.passed = [array("b") for _ in probes]
+        self.latencies = [array("f") for _ in probes]
+        self.outages = []  # type: List[List[Optional[datetime]]]
+
+    def append(
+        self,
+        at: datetime,
+        samples: List[Tuple[Optional[bool], Optional[float]]],
+    ) -> None:
+        self.offsets.append((at - self.started).total_seconds())
+        for index, (ok, latency) in enumerate(samples):
+            self.passed[index].append(-1 if ok is None else int(ok))
+            self.latencies[index].append(-1 if latency is None else latency)
+
+    def mark(
+        self, healthy: bool, failed_at: Optional[datetime], checked_at: datetime
+    ) -> None:
+        ongoing = self.outages and self.outages[-1][1] is None
+        if not healthy and not ongoing:
+            self.outages.append([failed_at or checked_at, None])
+        elif healthy and ongoing:
+            self.outages[-1][1] = checked_at
+
+    def last_samples(
+        self,
+    ) -> List[Tuple[str, Optional[bool], Optional[float]]]:
+        if not self.offsets:
+            return []
+
+        samples = []
+        for name, passed, latencies in zip(
+            self.names, self.passed, self.latencies
+        ):
+            ok = None if passed[-1] == -1 else bool(passed[-1])
+            latency = None if latencies[-1] < 0 else float(latencies[-1])
+            samples.append((name, ok, latency))
+        return samples
+
+    def outage_started(self) -> Optional[datetime]:
+        if self.outages and self.outages[-1][1] is None:
+            return self.outages[-1][0]
+        return None
+
+    def to_dict(
+        self, run: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Export the series and its outages. When the `run` of the journal is
+        given, the time to detect an outage is measured from the start of the
+        last action started before it was detected.
+        """
+        actions = get_actions_start_time(run or [])
+
+        outages = []
+        detect = []
+        recover = []
+        for detected, recovered in self.outages:
+            duration = get_outage_duration(detected, recovered)
+            if duration is not None:
+                recover.append(duration)
+
+            ttd = None
+            cause = [a for a in actions if detected and a <= detected]
+            if cause:
+                ttd = (detected - cause[-1]).total_seconds()  # type: ignore
+                detect.append(ttd)
+
+            outages.append(
+                {
+                    "detection_time": (
+                        detected.isoformat() if detected else None
+                    ),
+                    "recovery_time": (
+                        recovered.isoformat() if recovered else None
+                    ),
+                    "outage_duration": duration,
+                    "time_to_detect": ttd,
+                }
+            )
+
+        return {
+            "series": {
+                "start": self.started.isoformat(),
+                "probes": self.names,
+                "offsets": [round(o, 3) for o in self.offsets],
+                "passed": [
+                    [None if p == -1 else bool(p) for p in column]
+                    for column in self.passed
+                ],
+                "latencies": [
+                    [None if la < 0 else round(la, 4) for la in column]
+                    for column in self.latencies
+                ],
+            },
+            "outages": outages,
+            "mttd": sum(detect) / len(detect) if detect else None,
+            "mttr": sum(recover) / len(recover) if recover else None,
+        }
+
+
+def get_actions_start_time(run: List[Dict[str, Any]]) -> List[datetime]:
+    starts = []
+    for r in run:
+        if r.get("activity", {}).get("type") != "action" or not r.get("start"):
+            continue
+
+        try:
+            start = datetime.fromisoformat(r["start"])
+        except (TypeError, ValueError):
+            continue
+
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        starts.append(start)
+
+    return sorted(starts)
+
+
+def get_next_tick(
+    previous: float, frequency: float, now: float
+) -> Tuple[float, int]:
+    """
+    Return the next tick after `now` following `previous` and how many
+    ticks were missed in between.
+    """
+    next_tick = previous + frequency
+    if now <= next_tick:
+        return (next_tick, 0)
+
+    missed = int((now - next_tick) // frequency) + 1
+    return (next_tick + missed * frequency, missed)
 
 
 def get_utc_now() -> datetime:
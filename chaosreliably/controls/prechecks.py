@@ -1,4 +1,4 @@
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from chaoslib.run import EventHandlerRegistry
 from chaoslib.types import Configuration, Experiment, Secrets
@@ -10,14 +10,21 @@ __all__ = ["configure_control"]
 
 def configure_control(
     event_registry: EventHandlerRegistry,
-    url: str,
+    url: Union[str, List[Union[str, Dict[str, str]]]],
     auth: Optional[str] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    quorum: Union[str, int, Dict[str, str]] = "any",
     **kwargs: Any,
 ) -> None:
+    """
+    Call the precheck `url` once, before the execution starts. When `url` is
+    a list, the endpoints are called concurrently and the execution is
+    interrupted when as many of them as set by `quorum` failed: `"any"`,
+    `"all"` or a number of endpoints.
+    """
     initialize(event_registry)
-    register(url=url, auth=auth)
+    register(url=url, auth=auth, quorum=quorum)
 
 
 def before_experiment_control(
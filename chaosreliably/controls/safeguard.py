@@ -1,4 +1,4 @@
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from chaoslib.run import EventHandlerRegistry
 from chaoslib.types import Configuration, Experiment, Secrets
@@ -10,15 +10,29 @@ __all__ = ["configure_control"]
 
 def configure_control(
     event_registry: EventHandlerRegistry,
-    url: str,
+    url: Union[str, List[Union[str, Dict[str, str]]]],
     frequency: float,
     auth: Optional[str] = None,
     configuration: Configuration = None,
     secrets: Secrets = None,
+    quorum: Union[str, int, Dict[str, str]] = "any",
+    max_age: Optional[float] = None,
     **kwargs: Any,
 ) -> None:
+    """
+    Call the safeguard `url` every `frequency` seconds. When `url` is a list,
+    the endpoints are called concurrently and the execution is interrupted
+    when as many of them as set by `quorum` failed: `"any"`, `"all"` or a
+    number of endpoints.
+
+    Endpoints are called conditionally when they return an `ETag` or a
+    `Last-Modified` header. Set `max_age` to reuse a response, across all
+    safeguards calling the same endpoint, for that many seconds.
+    """
     initialize(event_registry)
-    register(url=url, auth=auth, frequency=frequency)
+    register(
+        url=url, auth=auth, frequency=frequency, quorum=quorum, max_age=max_age
+    )
 
 
 def before_experiment_control(
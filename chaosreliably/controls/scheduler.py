@@ -0,0 +1,129 @@
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+__all__ = ["ScheduledJob", "Scheduler", "scheduler"]
+logger = logging.getLogger("chaostoolkit")
+
+
+class ScheduledJob:
+    def __init__(
+        self, func: Callable[[], None], frequency: Optional[float] = None
+    ) -> None:
+        self.func = func
+        self.frequency = frequency
+        self.due = 0.0
+        self.cancelled = False
+        # set whenever the job is not running
+        self.idle = threading.Event()
+        self.idle.set()
+
+
+class Scheduler:
+    """
+    Run jobs, once or every `frequency` seconds, from a single timer thread
+    and a small pool of workers, whatever the number of jobs.
+
+    Repeating jobs are scheduled on fixed ticks from their first run and a
+    job never overlaps itself: ticks missed while it ran are skipped.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.max_workers = max_workers or int(
+            os.getenv("RELIABLY_SCHEDULER_WORKERS", "4")
+        )
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, int, ScheduledJob]] = []
+        self._seq = itertools.count()
+        self._pool = None  # type: Optional[ThreadPoolExecutor]
+        self._t = None  # type: Optional[threading.Thread]
+
+    def schedule(
+        self,
+        func: Callable[[], None],
+        frequency: Optional[float] = None,
+        delay: float = 0.0,
+    ) -> ScheduledJob:
+        job = ScheduledJob(func, frequency)
+        with self._cond:
+            self._ensure_started()
+            self._push(job, time.monotonic() + delay)
+            self._cond.notify()
+        return job
+
+    def cancel(
+        self,
+        job: ScheduledJob,
+        wait: bool = True,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Stop running `job`. When `wait` is set, wait up to `timeout` seconds
+        for its current run to complete.
+        """
+        with self._cond:
+            job.cancelled = True
+
+        if wait:
+            job.idle.wait(timeout=timeout)
+
+    def _ensure_started(self) -> None:
+        if self._t is None or not self._t.is_alive():
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="reliably-scheduler",
+            )
+            self._t = threading.Thread(
+                None, self._run, name="reliably-scheduler", daemon=True
+            )
+            self._t.start()
+
+    def _push(self, job: ScheduledJob, due: float) -> None:
+        job.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+
+                due, _, job = self._heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                if job.cancelled:
+                    continue
+
+                job.idle.clear()
+
+            self._pool.submit(self._execute, job)  # type: ignore
+
+    def _execute(self, job: ScheduledJob) -> None:
+        try:
+            job.func()
+        except Exception:
+            logger.debug("Scheduled job failed", exc_info=True)
+        finally:
+            with self._cond:
+                if job.frequency and not job.cancelled:
+                    now = time.monotonic()
+                    due = job.due + job.frequency
+                    if due < now:
+                        missed = int((now - due) // job.frequency) + 1
+                        due += missed * job.frequency
+                    self._push(job, due)
+                    self._cond.notify()
+
+                job.idle.set()
+
+
+scheduler = Scheduler()
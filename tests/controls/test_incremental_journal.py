@@ -0,0 +1,131 @@
+import json
+
+import httpx
+
+from chaosreliably import LogBuffer
+from chaosreliably.controls.experiment import (
+    JournalTracker,
+    complete_run,
+    send_journal,
+)
+
+URL = "https://app.reliably.com/api/v1/organization/org/experiments/exp/executions/exec/results"  # noqa
+
+
+def make_journal():
+    return {
+        "experiment": {"title": "n/a"},
+        "status": None,
+        "deviated": False,
+        "run": [],
+        "rollbacks": [],
+    }
+
+
+def test_first_upload_is_a_full_checkpoint(respx_mock):
+    put = respx_mock.put(URL).mock(return_value=httpx.Response(200))
+    tracker = JournalTracker()
+    journal = make_journal()
+
+    send_journal("org", "exp", "exec", journal, {}, {"token": "xyz"}, tracker)
+
+    assert put.call_count == 1
+    assert tracker.needs_checkpoint() is False
+    assert tracker.lengths["run"] == 0
+
+
+def test_only_changes_are_sent_as_a_patch(respx_mock):
+    respx_mock.put(URL).mock(return_value=httpx.Response(200))
+    patch = respx_mock.patch(URL).mock(return_value=httpx.Response(200))
+    tracker = JournalTracker()
+    journal = make_journal()
+
+    send_journal("org", "exp", "exec", journal, {}, {"token": "xyz"}, tracker)
+
+    journal["run"].append({"activity": {"name": "a"}, "status": "succeeded"})
+    journal["status"] = "completed"
+    send_journal("org", "exp", "exec", journal, {}, {"token": "xyz"}, tracker)
+
+    assert patch.call_count == 1
+    body = json.loads(patch.calls.last.request.content)
+    ops = json.loads(body["patch"])
+    assert ops == [
+        {"op": "add", "path": "/status", "value": "completed"},
+        {
+            "op": "add",
+            "path": "/run/-",
+            "value": {"activity": {"name": "a"}, "status": "succeeded"},
+        },
+    ]
+    assert tracker.lengths["run"] == 1
+
+
+def test_runs_completed_in_place_are_sent_again(respx_mock):
+    respx_mock.put(URL).mock(return_value=httpx.Response(200))
+    patch = respx_mock.patch(URL).mock(return_value=httpx.Response(200))
+    tracker = JournalTracker()
+    journal = make_journal()
+
+    send_journal("org", "exp", "exec", journal, {}, {"token": "xyz"}, tracker)
+
+    # chaoslib adds the run when the activity starts and completes it later
+    run = {"activity": {"name": "a"}, "output": None, "start": "now"}
+    journal["run"].append(run)
+    send_journal("org", "exp", "exec", journal, {}, {"token": "xyz"}, tracker)
+
+    run.update(status="succeeded", output=1, end="later", duration=1.0)
+    send_journal("org", "exp", "exec", journal, {}, {"token": "xyz"}, tracker)
+
+    assert patch.call_count == 2
+    body = json.loads(patch.calls.last.request.content)
+    assert json.loads(body["patch"]) == [
+        {"op": "replace", "path": "/run/0", "value": run},
+    ]
+
+    send_journal("org", "exp", "exec", journal, {}, {"token": "xyz"}, tracker)
+    assert patch.call_count == 2
+
+
+def test_checkpoint_is_sent_periodically(respx_mock):
+    put = respx_mock.put(URL).mock(return_value=httpx.Response(200))
+    patch = respx_mock.patch(URL).mock(return_value=httpx.Response(200))
+    tracker = JournalTracker(checkpoint_every=2)
+    journal = make_journal()
+
+    for i in range(4):
+        journal["run"].append({"activity": {"name": str(i)}})
+        send_journal(
+            "org", "exp", "exec", journal, {}, {"token": "xyz"}, tracker
+        )
+
+    assert put.call_count == 2
+    assert patch.call_count == 2
+
+
+def test_fallback_to_full_upload_when_patch_unsupported(respx_mock):
+    put = respx_mock.put(URL).mock(return_value=httpx.Response(200))
+    respx_mock.patch(URL).mock(return_value=httpx.Response(405))
+    tracker = JournalTracker()
+    journal = make_journal()
+
+    send_journal("org", "exp", "exec", journal, {}, {"token": "xyz"}, tracker)
+    journal["status"] = "completed"
+    send_journal("org", "exp", "exec", journal, {}, {"token": "xyz"}, tracker)
+
+    assert tracker.enabled is False
+    assert put.call_count == 2
+
+
+def test_complete_run_streams_the_full_log(respx_mock):
+    put = respx_mock.put(URL).mock(return_value=httpx.Response(200))
+    buffer = LogBuffer(max_memory=8)
+    buffer.write('first "line"\n')
+    buffer.write("second line ü\n")
+
+    complete_run(
+        "org", "exp", "exec", make_journal(), buffer, {}, {"token": "xyz"}
+    )
+
+    body = json.loads(put.calls.last.request.read())
+    assert body["log"] == 'first "line"\nsecond line ü\n'
+    assert json.loads(body["result"])["run"] == []
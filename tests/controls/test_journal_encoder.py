@@ -0,0 +1,113 @@
+import json
+
+import orjson
+from chaoslib.activity import execute_activity
+from chaoslib.run import EventHandlerRegistry, RunEventHandler
+
+from chaosreliably.controls.experiment import JournalEncoder, as_json
+
+
+def make_journal():
+    activity = {
+        "name": "a",
+        "type": "action",
+        "provider": {"type": "python", "module": "os", "func": "getcwd"},
+    }
+    return {
+        "experiment": {
+            "title": "n/a",
+            "steady-state-hypothesis": {"title": "n/a", "probes": [activity]},
+            "method": [activity],
+            "extensions": [{"name": "reliably", "pauses": []}],
+        },
+        "status": None,
+        "run": [
+            {
+                "activity": activity,
+                "status": "succeeded",
+                "end": "2024-01-01T00:00:01+00:00",
+                "duration": 1.0,
+            }
+        ],
+        "rollbacks": [],
+    }
+
+
+def test_encoded_journal_is_equivalent():
+    journal = make_journal()
+    encoder = JournalEncoder()
+
+    assert orjson.loads(encoder.encode(journal)) == journal
+
+
+def test_changes_to_mutable_sections_are_encoded():
+    journal = make_journal()
+    encoder = JournalEncoder()
+    encoder.encode(journal)
+
+    journal["status"] = "completed"
+    journal["experiment"]["extensions"][0]["pauses"].append({"duration": 1})
+    journal["experiment"]["method"].insert(0, {"name": "pause"})
+    journal["run"].append({"activity": {"name": "b"}, "status": "failed"})
+
+    assert orjson.loads(encoder.encode(journal)) == journal
+
+
+def test_activities_and_runs_are_encoded_once(monkeypatch):
+    import chaosreliably.controls.experiment as xp
+
+    journal = make_journal()
+    encoder = JournalEncoder()
+    encoder.encode(journal)
+
+    encoded = []
+    original = xp.to_compact_json
+
+    def counting(value):
+        encoded.append(value)
+        return original(value)
+
+    monkeypatch.setattr(xp, "to_compact_json", counting)
+    encoder.encode(journal)
+
+    assert journal["run"][0] not in encoded
+    assert journal["experiment"]["method"][0] not in encoded
+
+
+def test_large_integers_only_fall_back_for_their_subtree():
+    journal = make_journal()
+    journal["run"][0]["output"] = {"big": 2**70, "small": 1}
+
+    encoded = as_json(journal)
+    assert json.loads(encoded)["run"][0]["output"] == {"big": 2**70, "small": 1}
+
+
+def test_runs_completed_in_place_are_encoded_again():
+    activity = {
+        "name": "a",
+        "type": "probe",
+        "provider": {"type": "python", "module": "os", "func": "getcwd"},
+    }
+    journal = make_journal()
+    journal["run"] = []
+    encoder = JournalEncoder()
+
+    class Uploader(RunEventHandler):
+        def start_activity(self, activity):
+            encoder.encode(journal)
+
+    registry = EventHandlerRegistry()
+    registry.register(Uploader())
+    execute_activity(
+        journal["experiment"],
+        activity,
+        None,
+        None,
+        None,
+        event_registry=registry,
+        runs=journal["run"],
+    )
+
+    run = orjson.loads(encoder.encode(journal))["run"][0]
+    assert run["status"] == "succeeded"
+    assert sorted(run) == sorted(journal["run"][0])
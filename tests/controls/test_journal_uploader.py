@@ -0,0 +1,50 @@
+import json
+import time
+
+import httpx
+
+from chaosreliably.controls.experiment import JournalUploader
+
+URL = "https://app.reliably.com/api/v1/organization/org/experiments/exp/executions/exec/results"  # noqa
+
+
+def test_uploader_does_not_block_and_coalesces_snapshots(respx_mock):
+    def slow_response(request):
+        time.sleep(0.5)
+        return httpx.Response(200)
+
+    put = respx_mock.put(URL).mock(side_effect=slow_response)
+
+    uploader = JournalUploader("org", "exp", "exec", {}, {"token": "xyz"})
+    uploader.start()
+
+    started = time.time()
+    for i in range(5):
+        uploader.submit({"status": None, "run": [i]})
+    assert time.time() - started < 0.5
+
+    uploader.stop(timeout=5)
+
+    assert 1 <= put.call_count < 5
+    body = json.loads(put.calls.last.request.content)
+    assert json.loads(body["result"])["run"] == [4]
+
+
+def test_uploader_is_closed_once_stopped(respx_mock):
+    def slow_response(request):
+        time.sleep(0.3)
+        return httpx.Response(503)
+
+    put = respx_mock.put(URL).mock(side_effect=slow_response)
+
+    uploader = JournalUploader("org", "exp", "exec", {}, {"token": "xyz"})
+    uploader.start()
+    uploader.submit({"status": None, "run": []})
+    time.sleep(0.1)
+
+    # the worker is still waiting on the first response
+    uploader.stop(timeout=0.1)
+    uploader.submit({"status": "completed", "run": []})
+    time.sleep(1.5)
+
+    assert put.call_count == 1
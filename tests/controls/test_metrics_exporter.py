@@ -0,0 +1,83 @@
+import threading
+import time
+
+import httpx
+import pytest
+
+from chaosreliably.controls.exporters import (
+    PrometheusExporter,
+    SampleExporter,
+    make_exporter,
+)
+
+
+def test_prometheus_exporter_serves_latest_samples():
+    exporter = PrometheusExporter(port=0, flush_interval=0.1)
+    exporter.start()
+    try:
+        exporter.export(
+            {
+                "at": None,
+                "healthy": False,
+                "outages": 1,
+                "probes": [("lookup", False, 0.25), ("other", None, None)],
+            }
+        )
+        time.sleep(0.3)
+
+        r = httpx.get(f"http://127.0.0.1:{exporter.port}/metrics")
+        assert r.status_code == 200
+        assert "reliably_metrics_healthy 0" in r.text
+        assert "reliably_metrics_outages_total 1" in r.text
+        assert 'reliably_metrics_probe_up{probe="lookup"} 0' in r.text
+        assert (
+            'reliably_metrics_probe_latency_seconds{probe="lookup"} 0.25'
+            in r.text
+        )
+        assert (
+            'reliably_metrics_probe_samples_total{probe="other",'
+            'outcome="failed"} 1' in r.text
+        )
+    finally:
+        exporter.close(timeout=2)
+
+
+def test_export_never_blocks_when_queue_is_full():
+    exporter = PrometheusExporter(port=0, max_pending=2)
+    try:
+        for _ in range(5):
+            exporter.export({"healthy": True, "outages": 0, "probes": []})
+        assert exporter.dropped == 3
+    finally:
+        exporter.server.server_close()
+
+
+def test_no_exporter_by_default():
+    assert make_exporter(None) is None
+    assert make_exporter("statsd") is None
+
+
+def test_sample_exporter_must_implement_flush():
+    with pytest.raises(TypeError):
+        SampleExporter()
+
+
+def test_close_honors_its_timeout_when_flush_is_stuck():
+    stuck = threading.Event()
+
+    class StuckExporter(SampleExporter):
+        def flush(self, batch):
+            stuck.wait()
+
+    exporter = StuckExporter(batch_size=1, max_pending=1)
+    exporter.start()
+    try:
+        exporter.export({"probes": [], "outages": 0})
+        time.sleep(0.1)
+        exporter.export({"probes": [], "outages": 0})
+
+        started = time.monotonic()
+        exporter.close(timeout=0.2)
+        assert time.monotonic() - started < 1
+    finally:
+        stuck.set()
@@ -0,0 +1,106 @@
+import httpx
+import pytest
+
+from chaosreliably import close_sessions, get_session
+from chaosreliably.controls.experiment import RetryPolicy, call_api
+
+URL = "https://app.reliably.com/api/v1/organization/org/plans/plan/status"
+
+
+def test_retry_unavailable_then_succeed(respx_mock):
+    route = respx_mock.put(URL).mock(
+        side_effect=[httpx.Response(503), httpx.Response(200)]
+    )
+
+    policy = RetryPolicy(base=0.01)
+    with get_session(None, {"token": "xyz"}) as session:
+        r = call_api(session, "PUT", "/org/plans/plan/status", policy)
+    close_sessions()
+
+    assert r.status_code == 200
+    assert route.call_count == 2
+
+
+def test_429_only_retried_with_retry_after(respx_mock):
+    route = respx_mock.put(URL).mock(return_value=httpx.Response(429))
+
+    with get_session(None, {"token": "xyz"}) as session:
+        r = call_api(session, "PUT", "/org/plans/plan/status")
+    close_sessions()
+
+    assert r.status_code == 429
+    assert route.call_count == 1
+
+
+def test_delay_honors_retry_after():
+    policy = RetryPolicy(cap=10)
+    r = httpx.Response(429, headers={"Retry-After": "3"})
+    assert policy.delay(0, r) == 3
+    r = httpx.Response(429, headers={"Retry-After": "120"})
+    assert policy.delay(0, r) == 120
+    assert policy.should_retry("PUT", 0, response=r) is False
+
+
+def test_not_retried_when_asked_to_wait_too_long(respx_mock):
+    route = respx_mock.put(URL).mock(
+        return_value=httpx.Response(503, headers={"Retry-After": "120"})
+    )
+
+    with get_session(None, {"token": "xyz"}) as session:
+        r = call_api(session, "PUT", "/org/plans/plan/status")
+    close_sessions()
+
+    assert r.status_code == 503
+    assert route.call_count == 1
+
+
+def test_delay_grows_with_jitter():
+    policy = RetryPolicy(base=1, cap=8)
+    for attempt, backoff in enumerate([1, 2, 4, 8, 8]):
+        d = policy.delay(attempt)
+        assert backoff / 2 <= d <= backoff
+
+
+def test_post_not_retried_on_read_error(respx_mock):
+    url = "https://app.reliably.com/api/v1/organization/org/experiments/exp/executions"  # noqa
+    route = respx_mock.post(url).mock(side_effect=httpx.ReadTimeout("boom"))
+
+    with get_session(None, {"token": "xyz"}) as session:
+        with pytest.raises(httpx.ReadTimeout):
+            call_api(session, "POST", "/org/experiments/exp/executions")
+    close_sessions()
+
+    assert route.call_count == 1
+
+
+@pytest.mark.parametrize("method,status", [("POST", 504), ("PATCH", 502)])
+def test_non_idempotent_calls_not_retried_when_outcome_unknown(
+    respx_mock, method, status
+):
+    route = respx_mock.route(method=method, url=URL).mock(
+        side_effect=[httpx.Response(status), httpx.Response(201)]
+    )
+
+    policy = RetryPolicy(base=0.01)
+    with get_session(None, {"token": "xyz"}) as session:
+        r = call_api(session, method, "/org/plans/plan/status", policy)
+    close_sessions()
+
+    assert r.status_code == status
+    assert route.call_count == 1
+
+
+def test_non_idempotent_calls_retried_when_asked_to(respx_mock):
+    route = respx_mock.post(URL).mock(
+        side_effect=[
+            httpx.Response(503, headers={"Retry-After": "0"}),
+            httpx.Response(201),
+        ]
+    )
+
+    with get_session(None, {"token": "xyz"}) as session:
+        r = call_api(session, "POST", "/org/plans/plan/status")
+    close_sessions()
+
+    assert r.status_code == 201
+    assert route.call_count == 2
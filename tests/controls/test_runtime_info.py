@@ -0,0 +1,46 @@
+import chaosreliably.controls.experiment as xp
+from chaosreliably.controls.experiment import add_runtime_info
+
+EXPERIMENT = {
+    "method": [
+        {
+            "type": "probe",
+            "name": "a",
+            "provider": {"type": "python", "module": "httpx", "func": "get"},
+        }
+    ]
+}
+
+
+def test_runtime_info_lists_extensions_of_activities(monkeypatch):
+    monkeypatch.setattr(xp, "packages_cache", {})
+    extension = {}
+    add_runtime_info(EXPERIMENT, extension)
+
+    names = [x["name"] for x in extension["chaostoolkit_extensions"]]
+    assert names == ["httpx"]
+
+
+def test_packages_are_scanned_once(monkeypatch, tmp_path):
+    monkeypatch.setattr(xp, "packages_cache", {})
+    monkeypatch.setenv("RELIABLY_PACKAGES_CACHE", str(tmp_path / "pkgs.json"))
+
+    calls = []
+    scan = xp.im.packages_distributions
+
+    def counting_scan():
+        calls.append(1)
+        return scan()
+
+    monkeypatch.setattr(xp.im, "packages_distributions", counting_scan)
+
+    add_runtime_info(EXPERIMENT, {})
+    add_runtime_info(EXPERIMENT, {})
+    assert len(calls) == 1
+
+    # a new process would read it from the on-disk cache
+    monkeypatch.setattr(xp, "packages_cache", {})
+    extension = {}
+    add_runtime_info(EXPERIMENT, extension)
+    assert len(calls) == 1
+    assert extension["chaostoolkit_extensions"][0]["name"] == "httpx"
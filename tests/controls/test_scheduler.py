@@ -0,0 +1,52 @@
+import threading
+import time
+
+from chaosreliably.controls.scheduler import Scheduler
+
+
+def test_thread_count_does_not_grow_with_jobs():
+    s = Scheduler(max_workers=2)
+    before = threading.active_count()
+    counts = [0] * 20
+
+    def make_job(i):
+        def job():
+            counts[i] += 1
+
+        return job
+
+    jobs = [s.schedule(make_job(i), frequency=0.1) for i in range(20)]
+    time.sleep(0.55)
+    # the timer thread and, at most, the workers
+    assert threading.active_count() <= before + 3
+
+    for job in jobs:
+        s.cancel(job)
+    total = list(counts)
+    time.sleep(0.3)
+
+    assert all(c >= 4 for c in total)
+    assert counts == total
+
+
+def test_one_shot_job_and_no_overlap():
+    s = Scheduler(max_workers=4)
+    running = []
+    overlaps = []
+    done = threading.Event()
+
+    def slow():
+        overlaps.append(len(running))
+        running.append(1)
+        time.sleep(0.25)
+        running.pop()
+
+    job = s.schedule(slow, frequency=0.1)
+    s.schedule(done.set, delay=0.1)
+
+    assert done.wait(timeout=1)
+    time.sleep(0.5)
+    s.cancel(job, timeout=1)
+
+    assert overlaps and max(overlaps) == 0
+    assert job.idle.is_set()
@@ -0,0 +1,76 @@
+import httpx
+
+from chaosreliably import close_sessions, get_session
+from chaosreliably.controls.experiment import ExecutionStateWatcher
+
+URL = "https://app.reliably.com/api/v1/organization/org/experiments/exp/executions/exec/state"  # noqa
+PATH = "/org/experiments/exp/executions/exec/state"
+
+
+def test_long_poll_sends_etag_and_wait_preference(respx_mock):
+    route = respx_mock.get(URL).mock(
+        side_effect=[
+            httpx.Response(
+                200,
+                json={"current": "running"},
+                headers={"ETag": '"v1"', "Preference-Applied": "wait=10"},
+            ),
+            httpx.Response(304, headers={"Preference-Applied": "wait=10"}),
+        ]
+    )
+
+    watcher = ExecutionStateWatcher(PATH)
+    with get_session(None, {"token": "xyz"}) as session:
+        assert watcher.fetch(session) == {"current": "running"}
+        assert watcher.next_delay() == 0
+        assert watcher.fetch(session) is None
+        assert watcher.next_delay() == 0
+    close_sessions()
+
+    first, second = route.calls
+    assert first.request.headers["Prefer"] == "wait=10"
+    assert "If-None-Match" not in first.request.headers
+    assert second.request.headers["If-None-Match"] == '"v1"'
+
+
+def test_fallback_to_adaptive_polling(respx_mock):
+    respx_mock.get(URL).mock(
+        side_effect=[
+            httpx.Response(200, json={"current": "running"}),
+            httpx.Response(200, json={"current": "running"}),
+            httpx.Response(200, json={"current": "running"}),
+            httpx.Response(200, json={"current": "pause", "duration": 0}),
+        ]
+    )
+
+    watcher = ExecutionStateWatcher(PATH, min_interval=1, max_interval=3)
+    with get_session(None, {"token": "xyz"}) as session:
+        assert watcher.fetch(session) == {"current": "running"}
+        assert watcher.long_poll is False
+        assert watcher.next_delay() == 1
+
+        assert watcher.fetch(session) == {"current": "running"}
+        assert watcher.next_delay() == 2
+        assert watcher.fetch(session) == {"current": "running"}
+        assert watcher.next_delay() == 3
+
+        assert watcher.fetch(session)["current"] == "pause"
+        assert watcher.next_delay() == 1
+    close_sessions()
+
+
+def test_repeated_states_are_not_dropped(respx_mock):
+    pause = {"current": "pause", "duration": 0}
+    respx_mock.get(URL).mock(
+        side_effect=[
+            httpx.Response(200, json=pause, headers={"ETag": '"v1"'}),
+            # the resume in between was missed
+            httpx.Response(200, json=pause, headers={"ETag": '"v3"'}),
+        ]
+    )
+
+    watcher = ExecutionStateWatcher(PATH)
+    with get_session(None, {"token": "xyz"}) as session:
+        assert watcher.fetch(session) == pause
+        assert watcher.fetch(session) == pause
+    close_sessions()
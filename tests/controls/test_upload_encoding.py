@@ -0,0 +1,54 @@
+import gzip
+import json
+
+import httpx
+
+from chaosreliably import LogBuffer, close_sessions
+from chaosreliably.controls.experiment import (
+    complete_run,
+    send_journal,
+    set_plan_status,
+)
+
+SECRETS = {"token": "xyz", "host": "reliably.test"}
+URL = "https://reliably.test/api/v1/organization/org/experiments/exp/executions/exec/results"  # noqa
+PLAN_URL = "https://reliably.test/api/v1/organization/org/plans/plan/status"
+
+
+def test_legacy_format_without_negotiation(respx_mock):
+    put = respx_mock.put(URL).mock(return_value=httpx.Response(200))
+
+    send_journal("org", "exp", "exec", {"status": None}, {}, SECRETS)
+    close_sessions()
+
+    request = put.calls.last.request
+    assert "Content-Encoding" not in request.headers
+    body = json.loads(request.content)
+    assert isinstance(body["result"], str)
+
+
+def test_compressed_compact_format_once_negotiated(respx_mock, monkeypatch):
+    monkeypatch.setenv("RELIABLY_PLAN_ID", "plan")
+    respx_mock.put(PLAN_URL).mock(
+        return_value=httpx.Response(200, headers={"Accept-Encoding": "gzip"})
+    )
+    put = respx_mock.put(URL).mock(return_value=httpx.Response(200))
+
+    set_plan_status("org", "running", None, {}, SECRETS)
+    send_journal("org", "exp", "exec", {"status": None}, {}, SECRETS)
+
+    request = put.calls.last.request
+    assert request.headers["Content-Encoding"] == "gzip"
+    body = json.loads(gzip.decompress(request.content))
+    assert body["result"] == {"status": None}
+    assert body["plan_id"] == "plan"
+
+    buffer = LogBuffer()
+    buffer.write("hello\n")
+    complete_run("org", "exp", "exec", {"status": "completed"}, buffer, {}, SECRETS)
+    close_sessions()
+
+    request = put.calls.last.request
+    body = json.loads(gzip.decompress(request.read()))
+    assert body["result"] == {"status": "completed"}
+    assert body["log"] == "hello\n"
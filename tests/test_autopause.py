@@ -269,3 +269,93 @@ def test_autopause_from_env():
         if activity["name"] in ("A", "B", "C"):
             assert activities[index+1]["provider"]["module"] == "chaosreliably.activities.pauses"
             assert activities[index+1]["provider"]["arguments"]["duration"] == 10.4
+
+
+def test_autopause_with_identical_activities():
+    action = {"name": "A", "type": "action", "provider": {"module": "os"}}
+    probe = {"name": "B", "type": "probe", "provider": {"module": "os"}}
+    experiment = {
+        "title": "an experiment",
+        "description": "n/a",
+        "method": [dict(action), dict(probe), dict(action), dict(probe)],
+    }
+
+    configure_control(experiment, {
+        "method": {
+            "actions": {"enabled": True, "pause_duration": 1},
+            "probes": {"enabled": True, "pause_duration": 2}
+        }
+    })
+
+    activities = experiment["method"]
+    assert [a["name"] for a in activities[::2]] == ["A", "B", "A", "B"]
+    assert [
+        a["provider"]["arguments"]["duration"] for a in activities[1::2]
+    ] == [1, 2, 1, 2]
+
+
+def test_autopause_scales_linearly():
+    comparisons = []
+
+    class Activity(dict):
+        __hash__ = None
+
+        def __eq__(self, other):
+            comparisons.append(1)
+            return dict.__eq__(self, other)
+
+    count = 1000
+    experiment = {
+        "title": "an experiment",
+        "description": "n/a",
+        "method": [
+            Activity(name=f"A{i}", type="action", provider={"module": "os"})
+            for i in range(count)
+        ]
+    }
+    configure_control(experiment, {
+        "method": {"actions": {"enabled": True, "pause_duration": 1}}
+    })
+
+    assert len(experiment["method"]) == count * 2
+    # looking each activity up in the method, as inserting pauses in place
+    # does, compares it to all the ones before it
+    assert len(comparisons) <= count
+
+
+def test_autopause_pauses_are_not_shared():
+    def make_experiment():
+        return {
+            "title": "an experiment",
+            "description": "n/a",
+            "method": [
+                {"name": "A", "type": "action", "provider": {"module": "os"}},
+                {"name": "B", "type": "probe", "provider": {"module": "os"}},
+            ],
+            "rollbacks": [
+                {"name": "C", "type": "action", "provider": {"module": "os"}},
+            ]
+        }
+
+    config = {
+        "method": {"probes": {"enabled": True, "pause_duration": 3}},
+        "rollbacks": {"enabled": True, "pause_duration": 4}
+    }
+
+    first = make_experiment()
+    configure_control(first, config)
+
+    second = make_experiment()
+    b = second["method"][1]
+    configure_control(second, config)
+
+    assert second["method"][1] is b
+    assert second["method"][2] is not first["method"][2]
+    assert second["method"][2]["name"] != first["method"][2]["name"]
+    assert second["method"][2]["provider"]["arguments"]["duration"] == 3
+    assert second["rollbacks"][1]["provider"]["arguments"]["duration"] == 4
+
+    config["rollbacks"]["pause_duration"] = 5
+    third = make_experiment()
+    configure_control(third, config)
+    assert third["rollbacks"][1]["provider"]["arguments"]["duration"] == 5
@@ -0,0 +1,228 @@
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from chaoslib.exceptions import ActivityFailed
+
+from chaosreliably.activities.gh.probes import closed_pr_ratio, pr_duration
+
+URL = "https://api.github.com/repos/o/r/pulls"
+
+
+def make_pull(number, created, closed=None):
+    fmt = "%Y-%m-%dT%H:%M:%SZ"
+    return {
+        "number": number,
+        "created_at": created.strftime(fmt),
+        "closed_at": closed.strftime(fmt) if closed else None,
+    }
+
+
+def mock_pages(respx_mock, pages):
+    def respond(request):
+        page = int(request.url.params["page"])
+        assert request.url.params["per_page"] == "100"
+        return httpx.Response(
+            200,
+            json=pages[page - 1],
+            headers={
+                "Link": f'<{URL}?per_page=100&page=2>; rel="next", '
+                f'<{URL}?per_page=100&page={len(pages)}>; rel="last"'
+            },
+        )
+
+    return respx_mock.get(URL).mock(side_effect=respond)
+
+
+def test_pr_duration_fetches_all_pages(respx_mock, monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", "xyz")
+    now = datetime.today()
+    pages = [
+        [make_pull(i, now - timedelta(hours=i), now) for i in range(p, p + 3)]
+        for p in range(0, 15, 3)
+    ]
+    route = mock_pages(respx_mock, pages)
+
+    durations = pr_duration("o/r", window=None)
+
+    assert len(durations) == 15
+    assert route.call_count == 5
+    assert sorted(
+        int(c.request.url.params["page"]) for c in route.calls
+    ) == [1, 2, 3, 4, 5]
+
+
+def test_pr_duration_stops_outside_window(respx_mock, monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", "xyz")
+    now = datetime.today()
+    pages = [
+        [make_pull(i, now - timedelta(days=i)) for i in range(p, p + 2)]
+        for p in range(0, 40, 2)
+    ]
+    route = mock_pages(respx_mock, pages)
+
+    durations = pr_duration("o/r", window="3d")
+
+    assert len(durations) == 3
+    # the page outside the window and, at most, the ones prefetched
+    assert route.call_count < 8
+
+
+def test_closed_pr_ratio(respx_mock, monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", "xyz")
+    now = datetime.today()
+    pages = [
+        [
+            make_pull(1, now - timedelta(days=1), now),
+            make_pull(2, now - timedelta(days=2)),
+        ],
+        [
+            make_pull(3, now - timedelta(days=3), now),
+            make_pull(4, now - timedelta(days=10)),
+        ],
+        [make_pull(5, now - timedelta(days=11))],
+    ]
+    mock_pages(respx_mock, pages)
+
+    assert closed_pr_ratio("o/r", window="5d") == 200.0 / 3
+
+
+def test_client_serves_not_modified_responses_from_cache(respx_mock):
+    from chaosreliably.activities.gh import GitHubClient, ResponseCache
+
+    url = "https://api.github.com/orgs/o/settings/billing/actions"
+    route = respx_mock.get(url).mock(side_effect=[
+        httpx.Response(200, json={"total_minutes_used": 3}, headers={"ETag": '"v1"'}),
+        httpx.Response(304),
+    ])
+
+    with GitHubClient("xyz", cache=ResponseCache()) as client:
+        assert client.get(url).json() == {"total_minutes_used": 3}
+        r = client.get(url)
+
+    assert r.status_code == 200
+    assert r.json() == {"total_minutes_used": 3}
+    assert route.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+
+def test_client_cache_outlives_the_process(respx_mock, tmp_path):
+    from chaosreliably.activities.gh import GitHubClient, ResponseCache
+
+    url = "https://api.github.com/orgs/o/settings/billing/actions"
+    route = respx_mock.get(url).mock(side_effect=[
+        httpx.Response(200, json={"total_minutes_used": 3}, headers={"ETag": '"v1"'}),
+        httpx.Response(304),
+    ])
+
+    with GitHubClient("xyz", cache=ResponseCache(str(tmp_path))) as client:
+        client.get(url)
+
+    with GitHubClient("xyz", cache=ResponseCache(str(tmp_path))) as client:
+        assert client.get(url).json() == {"total_minutes_used": 3}
+
+    assert route.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+
+def test_client_waits_when_asked_to_retry_later(respx_mock):
+    from chaosreliably.activities.gh import GitHubClient, RateLimiter
+
+    url = "https://api.github.com/repos/o/r/actions/runs"
+    route = respx_mock.get(url).mock(side_effect=[
+        httpx.Response(429, headers={"Retry-After": "1"}),
+        httpx.Response(200, json={"total_count": 0}),
+    ])
+
+    started = time.monotonic()
+    with GitHubClient("xyz", limiter=RateLimiter()) as client:
+        r = client.get(url)
+
+    assert r.json() == {"total_count": 0}
+    assert route.call_count == 2
+    assert time.monotonic() - started >= 1
+
+
+def test_client_fails_when_rate_limit_is_exhausted(respx_mock):
+    from chaosreliably.activities.gh import GitHubClient, RateLimiter
+
+    url = "https://api.github.com/repos/o/r/actions/runs"
+    route = respx_mock.get(url).mock(return_value=httpx.Response(
+        200,
+        json={"total_count": 0},
+        headers={
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(int(time.time()) + 3600),
+        },
+    ))
+
+    with GitHubClient("xyz", limiter=RateLimiter(max_wait=5)) as client:
+        client.get(url)
+        with pytest.raises(ActivityFailed) as x:
+            client.get(url)
+
+    assert "rate limit" in str(x.value)
+    assert route.call_count == 1
+
+
+def test_client_cache_is_bounded_in_size():
+    from chaosreliably.activities.gh import ResponseCache
+
+    cache = ResponseCache(max_bytes=10)
+    cache.set("a", {"etag": '"a"', "content": "12345"})
+    cache.set("b", {"etag": '"b"', "content": "12345"})
+    cache.set("c", {"etag": '"c"', "content": "123"})
+    cache.set("d", {"etag": '"d"', "content": "12345678901"})
+
+    assert list(cache.entries) == ["b", "c"]
+    assert cache.size == 8
+
+
+def test_client_only_caches_first_page_of_listings(respx_mock, monkeypatch):
+    from chaosreliably.activities.gh import GitHubClient, ResponseCache
+
+    def respond(request):
+        page = int(request.url.params["page"])
+        return httpx.Response(
+            200,
+            json=[page],
+            headers={
+                "ETag": f'"{page}"',
+                "Link": f'<{URL}?per_page=100&page=3>; rel="last"',
+            },
+        )
+
+    respx_mock.get(URL).mock(side_effect=respond)
+
+    cache = ResponseCache()
+    with GitHubClient("xyz", cache=cache) as client:
+        assert [r.json() for r in client.iter_pages(URL)] == [[1], [2], [3]]
+
+    assert len(cache.entries) == 1
+
+
+def test_not_modified_responses_do_not_spend_the_budget(respx_mock):
+    from chaosreliably.activities.gh import (
+        GitHubClient,
+        RateLimiter,
+        ResponseCache,
+    )
+
+    url = "https://api.github.com/repos/o/r/actions/runs"
+    headers = {
+        "X-RateLimit-Remaining": "4",
+        "X-RateLimit-Reset": str(int(time.time()) + 3600),
+    }
+    route = respx_mock.get(url).mock(side_effect=[
+        httpx.Response(
+            200, json={"total_count": 0}, headers=dict(headers, ETag='"v1"')
+        ),
+    ] + [httpx.Response(304, headers=headers)] * 10)
+
+    limiter = RateLimiter(max_wait=1)
+    with GitHubClient("xyz", cache=ResponseCache(), limiter=limiter) as client:
+        for _ in range(11):
+            assert client.get(url).json() == {"total_count": 0}
+
+    assert route.call_count == 11
+    assert limiter.remaining == 4
+    assert limiter.in_flight == 0
@@ -0,0 +1,59 @@
+import logging
+
+from chaosreliably import LogBuffer, attach_log_stream_handler
+
+
+def test_read_only_what_was_written_since_offset() -> None:
+    buffer = LogBuffer()
+    buffer.write("hello\n")
+    buffer.write("wörld\n")
+
+    log, offset = buffer.read_from(0)
+    assert log == "hello\nwörld\n"
+    assert offset == len("hello\nwörld\n".encode("utf-8"))
+
+    assert buffer.read_from(offset) == ("", offset)
+
+    buffer.write("again\n")
+    log, next_offset = buffer.read_from(offset)
+    assert log == "again\n"
+    assert next_offset == offset + 6
+    assert buffer.getvalue() == "hello\nwörld\nagain\n"
+
+
+def test_log_handler_writes_to_buffer() -> None:
+    from chaosreliably import STREAM_LOG
+
+    logger = logging.getLogger("test-log-buffer")
+    logger.setLevel(logging.DEBUG)
+    _, offset = STREAM_LOG.read_from(STREAM_LOG.size)
+
+    with attach_log_stream_handler(logger, logging.Formatter("%(message)s")):
+        logger.info("first")
+        logger.info("second")
+
+    log, _ = STREAM_LOG.read_from(offset)
+    assert log == "first\nsecond\n"
+
+
+def test_spill_to_disk_when_over_memory_cap() -> None:
+    buffer = LogBuffer(max_memory=16)
+    lines = [f"line {i} é\n" for i in range(20)]
+    for line in lines:
+        buffer.write(line)
+
+    assert buffer._memory <= 16
+    assert buffer._spilled > 0
+    assert buffer.getvalue() == "".join(lines)
+
+    offset = len("".join(lines[:7]).encode("utf-8"))
+    log, size = buffer.read_from(offset)
+    assert log == "".join(lines[7:])
+    assert size == buffer.size
+
+    streamed = b"".join(buffer.iter_from(0, chunk_size=5))
+    assert streamed.decode("utf-8") == "".join(lines)
+
+    buffer.reset()
+    assert buffer.size == 0
+    assert buffer.getvalue() == ""
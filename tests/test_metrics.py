@@ -159,3 +159,164 @@ def test_compute_metrics_with_timeout(respx_mock):
         assert m["outage_duration"] is None
         assert m["went_over_timeout"] is True
         assert m["timeout"] == 6
+
+
+def test_probes_run_concurrently_with_a_deadline(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    import chaosreliably.controls.metrics as m
+
+    def slow_probe(probe, configuration, secrets):
+        time.sleep(probe["sleep"])
+        return (True, m.get_utc_now())
+
+    monkeypatch.setattr(m, "evaluate_probe", slow_probe)
+
+    probes = [{"name": f"p{i}", "sleep": 0.5} for i in range(4)]
+    pool = ThreadPoolExecutor(max_workers=4)
+    try:
+        started = time.time()
+        healthy, failed_at, _ = m.run_probes(pool, probes, {}, 5)
+        assert time.time() - started < 1.5
+        assert healthy is True
+        assert failed_at is None
+
+        probes.append({"name": "stuck", "sleep": 2})
+        running = {}
+        healthy, failed_at, _ = m.run_probes(pool, probes, running, 1)
+        assert healthy is False
+        assert failed_at is not None
+
+        # the stuck probe is not started again while still running
+        healthy, _, _ = m.run_probes(pool, probes, running, 1)
+        assert healthy is False
+    finally:
+        pool.shutdown(wait=True)
+
+
+def test_ticks_are_fixed_and_missed_ones_skipped():
+    from chaosreliably.controls.metrics import get_next_tick
+
+    assert get_next_tick(100.0, 10, 103.0) == (110.0, 0)
+    assert get_next_tick(100.0, 10, 110.0) == (110.0, 0)
+    assert get_next_tick(100.0, 10, 112.0) == (120.0, 1)
+    assert get_next_tick(100.0, 10, 135.0) == (140.0, 3)
+
+
+def test_finish_wakes_up_the_measurement():
+    registry = EventHandlerRegistry()
+    probes = [
+        {
+            "name": "lookup-file",
+            "type": "probe",
+            "tolerance": True,
+            "provider": {
+                "type": "python",
+                "module": "os.path",
+                "func": "exists",
+                "arguments": {"path": "."},
+            },
+        }
+    ]
+    experiment = {"title": "n/a", "description": "n/a", "method": []}
+    journal = {"experiment": {"extensions": [{"name": "dora"}]}}
+
+    configure_control(
+        registry, probes, 30, 10, False, {}, {}, {}, experiment
+    )
+    registry.running(experiment, journal, {}, {}, None, None)
+    time.sleep(0.5)
+
+    started = time.time()
+    registry.finish(journal)
+    assert time.time() - started < 2
+
+    x = find_extension_by_name(journal["experiment"], "dora")
+    assert x["metrics"]["detection_time"] is None
+
+
+def test_series_tracks_many_outages_and_aggregates():
+    from datetime import datetime, timedelta, timezone
+
+    from chaosreliably.controls.metrics import MetricsSeries
+
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    series = MetricsSeries([{"name": "a"}, {"name": "b"}], t0)
+
+    def tick(seconds, a, b):
+        at = t0 + timedelta(seconds=seconds)
+        series.append(at, [a, b])
+        healthy = all(ok for ok, _ in (a, b))
+        series.mark(healthy, None if healthy else at, at)
+
+    tick(0, (True, 0.1), (True, 0.2))
+    tick(10, (False, 0.1), (True, 0.2))
+    tick(20, (True, 0.1), (True, 0.2))
+    tick(30, (True, 0.1), (None, None))
+    tick(40, (True, 0.1), (True, 0.2))
+
+    run = [
+        {"activity": {"type": "action"}, "start": "2024-01-01T00:00:04"},
+        {"activity": {"type": "probe"}, "start": "2024-01-01T00:00:09"},
+        {"activity": {"type": "action"}, "start": "2024-01-01T00:00:25"},
+    ]
+    d = series.to_dict(run)
+
+    assert d["series"]["probes"] == ["a", "b"]
+    assert d["series"]["offsets"] == [0, 10, 20, 30, 40]
+    assert d["series"]["passed"][0] == [True, False, True, True, True]
+    assert d["series"]["passed"][1] == [True, True, True, None, True]
+    assert d["series"]["latencies"][1][3] is None
+    assert len(d["outages"]) == 2
+    assert [o["outage_duration"] for o in d["outages"]] == [10, 10]
+    assert [o["time_to_detect"] for o in d["outages"]] == [6, 5]
+    assert d["mttr"] == 10
+    assert d["mttd"] == 5.5
+
+
+def test_probes_run_faster_while_degraded():
+    import threading
+
+    from chaosreliably.controls.metrics import compute_metrics
+
+    journal = {"experiment": {"extensions": [{"name": "dora"}]}}
+    should_exit = threading.Event()
+
+    with TemporaryDirectory() as d:
+        p = Path(d) / "my.txt"
+        probes = [
+            {
+                "name": "lookup-file",
+                "type": "probe",
+                "tolerance": True,
+                "provider": {
+                    "type": "python",
+                    "module": "os.path",
+                    "func": "exists",
+                    "arguments": {"path": str(p)},
+                },
+            }
+        ]
+
+        t = threading.Thread(
+            target=compute_metrics,
+            kwargs=dict(
+                state=journal,
+                should_exit=should_exit,
+                probes=probes,
+                frequency=30,
+                degraded_frequency=0.2,
+            ),
+        )
+        t.start()
+
+        time.sleep(0.6)
+        p.touch()
+        time.sleep(0.6)
+        should_exit.set()
+        t.join(timeout=5)
+
+    m = find_extension_by_name(journal["experiment"], "dora")["metrics"]
+    assert m["recovery_time"] is not None
+    assert 0.6 <= m["outage_duration"] < 1.2
+    assert len(m["series"]["offsets"]) >= 4
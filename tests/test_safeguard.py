@@ -44,6 +44,42 @@ def test_prechecks_run_interrupts_execution(respx_mock):
     assert proxy.guardians[0].guardian.interrupted is True
 
 
+def test_prechecks_interrupt_even_when_run_before_scheduled(
+    respx_mock, monkeypatch
+):
+    from chaosreliably.controls import scheduler
+
+    url = "https://example.com/try-me"
+    respx_mock.get(url).mock(
+        return_value=httpx.Response(200, json={"ok": False, "error": "boom"})
+    )
+
+    # the check completes before schedule() returns the job
+    schedule = scheduler.schedule
+
+    def run_first(func, frequency=None, delay=0.0):
+        func()
+        return schedule(lambda: None, frequency=frequency, delay=delay)
+
+    monkeypatch.setattr(scheduler, "schedule", run_first)
+
+    proxy = ReliablySafeguardHandler()
+    registry = EventHandlerRegistry()
+    initialize(registry, handler=proxy)
+    register(url, handler=proxy, guardian_class=TestReliablyGuardian)
+
+    experiment = {"title": "an experiment", "description": "n/a", "method": []}
+    journal = {"experiment": experiment}
+
+    try:
+        run_all(experiment, None, None, handler=proxy)
+    finally:
+        registry.finish(journal)
+        registry.handlers.clear()
+
+    assert proxy.guardians[0].guardian.interrupted is True
+
+
 def test_safeguard_expects_a_200(respx_mock):
     url = "https://example.com/try-me"
 
@@ -214,3 +250,215 @@ def test_safeguard_can_be_many(respx_mock):
 
     assert respx_mock.calls.call_count > 1
     assert proxy.guardians[1].guardian.interrupted is False
+
+
+def test_safeguard_reuses_its_client(respx_mock):
+    from chaosreliably.activities.safeguard.probes import clients, close_clients
+
+    url = "https://example.com/try-me"
+    respx_mock.get(url).mock(return_value=httpx.Response(200, json={"ok": True}))
+
+    try:
+        assert call_endpoint(url) is True
+        assert call_endpoint(url) is True
+        assert len(clients) == 1
+
+        client = list(clients.values())[0]
+        assert client.timeout.connect == 1.0
+        assert client.timeout.read == 3.0
+    finally:
+        close_clients()
+
+    assert clients == {}
+
+
+def test_safeguard_endpoints_quorum(respx_mock):
+    from chaosreliably.activities.safeguard.probes import call_endpoints
+
+    urls = [f"https://example.com/try-me-{i}" for i in range(3)]
+    respx_mock.get(urls[0]).mock(
+        return_value=httpx.Response(200, json={"ok": False, "error": "boom"})
+    )
+    respx_mock.get(urls[1]).mock(return_value=httpx.Response(500))
+    respx_mock.get(urls[2]).mock(
+        return_value=httpx.Response(200, json={"ok": True})
+    )
+
+    assert call_endpoints(urls, quorum="any") is False
+    assert call_endpoints(urls, quorum=2) is False
+    assert call_endpoints(urls, quorum="3") is True
+    assert call_endpoints(urls, quorum="all") is True
+    assert call_endpoints(urls[2:], quorum="any") is True
+
+
+def test_many_urls_make_a_single_guardian(respx_mock):
+    url = "https://example.com/try-me"
+    url2 = "https://example.com/try-me-as-well"
+    respx_mock.get(url).mock(
+        return_value=httpx.Response(200, json={"ok": False, "error": "boom"})
+    )
+    respx_mock.get(url2).mock(
+        return_value=httpx.Response(200, json={"ok": True})
+    )
+
+    proxy = ReliablySafeguardHandler()
+    registry = EventHandlerRegistry()
+    initialize(registry, handler=proxy)
+    register(
+        [url, url2],
+        frequency=0.5,
+        handler=proxy,
+        guardian_class=TestReliablyGuardian,
+        quorum="all",
+    )
+
+    experiment = {"title": "an experiment", "description": "n/a", "method": []}
+    journal = {"experiment": experiment}
+
+    try:
+        run_all(experiment, None, None, handler=proxy)
+        time.sleep(1.5)
+    finally:
+        registry.finish(journal)
+        registry.handlers.clear()
+
+    assert len(proxy.guardians) == 1
+    probe = proxy.guardians[0].probes[0]
+    assert probe["provider"]["func"] == "call_endpoints"
+    assert respx_mock.calls.call_count > 2
+    assert proxy.guardians[0].guardian.interrupted is False
+
+
+def test_invalid_quorum_falls_back_to_any():
+    from chaosreliably.controls import ReliablySafeguardGuardian
+
+    urls = ["https://example.com/a", "https://example.com/b"]
+    g = ReliablySafeguardGuardian(urls, None, 0.5, quorum="most")
+    assert g.probes[0]["provider"]["arguments"]["quorum"] == "any"
+
+    g = ReliablySafeguardGuardian(urls, None, 0.5, quorum="2")
+    assert g.probes[0]["provider"]["arguments"]["quorum"] == "2"
+
+
+def test_safeguard_makes_conditional_requests(respx_mock):
+    from chaosreliably.activities.safeguard.probes import close_clients
+
+    url = "https://example.com/try-me-etag"
+    route = respx_mock.get(url).mock(side_effect=[
+        httpx.Response(
+            200, json={"ok": False, "error": "boom"}, headers={"ETag": '"v1"'}
+        ),
+        httpx.Response(304),
+        httpx.Response(200, json={"ok": True}, headers={"ETag": '"v2"'}),
+    ])
+
+    try:
+        assert call_endpoint(url) is False
+        assert call_endpoint(url) is False
+        assert route.calls[1].request.headers["If-None-Match"] == '"v1"'
+        assert call_endpoint(url) is True
+    finally:
+        close_clients()
+
+
+def test_safeguard_reuses_fresh_responses(respx_mock):
+    from chaosreliably.activities.safeguard.probes import close_clients
+
+    url = "https://example.com/try-me-fresh"
+    route = respx_mock.get(url).mock(
+        return_value=httpx.Response(200, json={"ok": True})
+    )
+
+    try:
+        assert call_endpoint(url, max_age=0.3) is True
+        assert call_endpoint(url, max_age=0.3) is True
+        assert route.call_count == 1
+
+        time.sleep(0.3)
+        assert call_endpoint(url, max_age=0.3) is True
+        assert route.call_count == 2
+    finally:
+        close_clients()
+
+
+def test_fresh_responses_are_kept_for_safeguards_sharing_the_url(respx_mock):
+    from chaosreliably.activities.safeguard.probes import close_clients
+
+    url = "https://example.com/try-me-shared"
+    route = respx_mock.get(url).mock(
+        return_value=httpx.Response(200, json={"ok": True})
+    )
+
+    try:
+        assert call_endpoint(url, max_age=5) is True
+        # a safeguard without max_age refreshes the entry but keeps it
+        assert call_endpoint(url) is True
+        assert route.call_count == 2
+
+        assert call_endpoint(url, max_age=5) is True
+        assert route.call_count == 2
+    finally:
+        close_clients()
+
+
+def test_safeguard_records_latencies_and_trip_to_exit(respx_mock):
+    url = "https://example.com/try-me"
+    respx_mock.get(url).mock(side_effect=[
+        httpx.Response(200, json={"ok": True}),
+        httpx.Response(200, json={"ok": False, "error": "boom"}),
+    ])
+
+    proxy = ReliablySafeguardHandler()
+    registry = EventHandlerRegistry()
+    initialize(registry, handler=proxy)
+    register(url, frequency=0.3, handler=proxy, guardian_class=TestReliablyGuardian)
+
+    experiment = {"title": "an experiment", "description": "n/a", "method": []}
+    journal = {"experiment": experiment}
+
+    try:
+        run_all(experiment, None, None, handler=proxy)
+        time.sleep(1)
+    finally:
+        registry.finish(journal)
+        registry.handlers.clear()
+
+    x = experiment["extensions"][0]["integrations"]["safeguards"]
+    h = x["latencies"][url]
+    assert h["count"] == 2
+    assert sum(h["counts"]) == 2
+    assert len(h["counts"]) == len(h["buckets"]) + 1
+
+    interruption = x["interruptions"][0]
+    assert interruption["failed_at"] is not None
+    # the test guardian takes 2s to exit
+    assert interruption["trip_to_exit"] >= 2
+
+
+def test_safeguard_trip_to_exit_ends_when_execution_is_interrupted(respx_mock):
+    url = "https://example.com/try-me"
+    respx_mock.get(url).mock(side_effect=[
+        httpx.Response(200, json={"ok": True}),
+        httpx.Response(200, json={"ok": False, "error": "boom"}),
+    ])
+
+    proxy = ReliablySafeguardHandler()
+    registry = EventHandlerRegistry()
+    initialize(registry, handler=proxy)
+    register(url, frequency=0.3, handler=proxy, guardian_class=TestReliablyGuardian)
+
+    experiment = {"title": "an experiment", "description": "n/a", "method": []}
+    journal = {"experiment": experiment}
+
+    try:
+        run_all(experiment, None, None, handler=proxy)
+        time.sleep(1)
+        # what chaoslib tells handlers once the execution was interrupted
+        registry.interrupted(experiment, journal)
+    finally:
+        registry.finish(journal)
+        registry.handlers.clear()
+
+    x = experiment["extensions"][0]["integrations"]["safeguards"]
+    # the failing response came after about 0.6s
+    assert 0.2 < x["interruptions"][0]["trip_to_exit"] < 1
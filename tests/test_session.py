@@ -0,0 +1,24 @@
+from chaosreliably import close_sessions, get_session
+
+
+def test_session_is_reused_across_calls() -> None:
+    secrets = {"token": "78890", "host": "reliably.dev"}
+
+    with get_session(None, secrets) as first:
+        pass
+
+    with get_session(None, secrets) as second:
+        assert second is first
+        assert str(second.base_url) == "https://reliably.dev/api/v1/organization/"
+
+    with get_session(None, {"token": "other", "host": "reliably.dev"}) as other:
+        assert other is not first
+
+    close_sessions()
+    assert first.is_closed
+
+    with get_session(None, secrets) as third:
+        assert third is not first
+        assert not third.is_closed
+
+    close_sessions()